@@ -0,0 +1,188 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from board import Board, PLAYER
+from solver import Solver
+
+# Кожен рівень розв'язується solver.Solver з лімітом часу й станів на рівень.
+# Усі рівні гри з папки levels/ розв'язуються за планом заповнення цілей за
+# секунди (найдовший, level4, — близько 10 с); розв'язки не мінімальні за поштовхами.
+
+# Символи, з яких може складатися рядок карти
+BOARD_CHARS = set("#@+$*. -_")
+
+# Статуси, після яких рівень не розв'язується повторно при відновленні
+FINAL_STATUSES = ("solved", "unsolvable", "invalid")
+
+# Скільки разів рівень може опинитися в пулі, що впав, перш ніж його
+# розв'язують в окремому пулі, щоб точно знайти рівень, що валить виконавця
+POOL_CRASHES = 2
+
+
+def parse_pack(path):
+    # Розбиття файлу на окремі рівні: рівні відділяються порожніми рядками
+    # або рядками, що не схожі на карту (назви, коментарі ";")
+    puzzles, rows = [], []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.rstrip("\n")
+            if line.strip() and set(line) <= BOARD_CHARS and "#" in line:
+                rows.append(line.replace("-", " ").replace("_", " "))
+            elif rows:
+                puzzles.append(rows)
+                rows = []
+    if rows:
+        puzzles.append(rows)
+    if len(puzzles) == 1:
+        return [(path, puzzles[0])]
+    return [(f"{path}#{number}", rows) for number, rows in enumerate(puzzles, 1)]
+
+
+def collect_puzzles(paths):
+    # Усі рівні з файлів і папок (папки обходяться без рекурсії, за алфавітом)
+    puzzles = []
+    for path in paths:
+        if os.path.isdir(path):
+            files = sorted(os.path.join(path, name) for name in os.listdir(path)
+                           if os.path.isfile(os.path.join(path, name)))
+        else:
+            files = [path]
+        for filename in files:
+            puzzles.extend(parse_pack(filename))
+    return puzzles
+
+
+def load_finished(output, retry_failed=False):
+    # Ідентифікатори рівнів, які вже є у файлі результатів
+    finished = set()
+    if not os.path.exists(output):
+        return finished
+    with open(output, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # обірваний останній рядок після аварійної зупинки
+            if not retry_failed or record.get("status") in FINAL_STATUSES:
+                finished.add(record["id"])
+    return finished
+
+
+def compact_results(output):
+    # Перезапис файлу результатів з одним записом на рівень (останнім, на місці
+    # першого): повторні спроби (--retry-failed) дописують нові записи до старих
+    records = {}
+    with open(output, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            records[record["id"]] = record
+    tmp = output + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for record in records.values():
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    os.replace(tmp, output)
+
+
+def _ends_with_newline(path):
+    with open(path, "rb") as f:
+        f.seek(-1, os.SEEK_END)
+        return f.read(1) == b"\n"
+
+
+def _limit_memory(memory_mb):
+    # Ліміт адресного простору процесу-виконавця (лише POSIX)
+    if not memory_mb:
+        return
+    try:
+        import resource
+    except ImportError:
+        return
+    limit = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+
+
+def solve_puzzle(puzzle_id, rows, options):
+    # Розв'язання одного рівня у процесі-виконавці
+    board = Board.from_rows(rows)
+    players = [board.position(i) for i, cell in enumerate(board.cells) if cell & PLAYER]
+    if len(players) != 1:
+        return {"id": puzzle_id, "solved": False, "status": "invalid"}
+    try:
+        result = Solver(board, players[0], **options).solve()
+    except MemoryError:
+        result = {"solved": False, "status": "memory"}
+    result["id"] = puzzle_id
+    return result
+
+
+def run_batch(paths, output, jobs=None, time_limit=60, max_states=1_000_000,
+              memory_mb=None, weight=1, retry_failed=False):
+    # Паралельне розв'язання рівнів; результати дописуються у output по мірі готовності
+    finished = load_finished(output, retry_failed)
+    pending = [(pid, rows) for pid, rows in collect_puzzles(paths) if pid not in finished]
+    options = {"time_limit": time_limit, "max_states": max_states, "weight": weight}
+    summary = {"skipped": len(finished), "solved": 0, "failed": 0}
+    if not pending:
+        return summary
+
+    with open(output, "a+", encoding="utf-8") as out:
+        # Обірваний останній рядок закривається, щоб нові записи йшли з нового рядка
+        if out.tell() and not _ends_with_newline(output):
+            out.write("\n")
+        crashes = {}
+        while pending:
+            # Пул, що впав (виконавця вбила ОС, ліміт пам'яті тощо), замінюється
+            # новим для незавершених рівнів. Рівень, з яким пул падав POOL_CRASHES
+            # разів, розв'язується окремо: якщо пул падає й тоді, винен саме він
+            alone = next((puzzle for puzzle in pending if crashes.get(puzzle[0], 0) >= POOL_CRASHES), None)
+            batch = pending if alone is None else [alone]
+            pending = [] if alone is None else [puzzle for puzzle in pending if puzzle is not alone]
+            with ProcessPoolExecutor(max_workers=jobs if alone is None else 1, initializer=_limit_memory,
+                                     initargs=(memory_mb,)) as pool:
+                futures = {pool.submit(solve_puzzle, pid, rows, options): (pid, rows) for pid, rows in batch}
+                for future in as_completed(futures):
+                    pid, rows = futures[future]
+                    try:
+                        result = future.result()
+                    except BrokenProcessPool:
+                        crashes[pid] = crashes.get(pid, 0) + 1
+                        if alone is None:
+                            pending.append((pid, rows))
+                            continue
+                        result = {"id": pid, "solved": False, "status": "crashed"}
+                    except Exception as e:
+                        result = {"id": pid, "solved": False, "status": "error", "error": repr(e)}
+                    summary["solved" if result["solved"] else "failed"] += 1
+                    out.write(json.dumps(result, ensure_ascii=False) + "\n")
+                    out.flush()
+                    print(f"{result['id']}: {result['status']}", file=sys.stderr)
+    compact_results(output)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Паралельне розв'язання наборів рівнів Sokoban")
+    parser.add_argument("paths", nargs="*", default=["levels"], help="файли рівнів або папки")
+    parser.add_argument("-o", "--output", default="solutions.jsonl", help="файл результатів (JSON Lines)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="кількість процесів")
+    parser.add_argument("--time-limit", type=float, default=60, help="ліміт часу на рівень, секунд")
+    parser.add_argument("--max-states", type=int, default=1_000_000, help="ліміт станів на рівень")
+    parser.add_argument("--memory-mb", type=int, default=None, help="ліміт пам'яті процесу, МБ")
+    parser.add_argument("--weight", type=float, default=1, help="вага оцінки розв'язувача")
+    parser.add_argument("--retry-failed", action="store_true",
+                        help="повторити рівні, що завершились за лімітом часу чи пам'яті")
+    args = parser.parse_args(argv)
+
+    summary = run_batch(args.paths, args.output, args.jobs, args.time_limit, args.max_states,
+                        args.memory_mb, args.weight, args.retry_failed)
+    print(json.dumps(summary))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
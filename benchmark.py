@@ -0,0 +1,322 @@
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+# Рендеринг вимірюється без вікна
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import db_utils
+import game_logic as game_logic_module
+from game_logic import GameLogic
+from level_cache import LevelCache
+
+# Напрямки ходів для випадкових блукань
+DIRECTIONS = {"up": (0, -1), "down": (0, 1), "left": (-1, 0), "right": (1, 0)}
+
+# Розміри синтетичних карт і кількість ящиків на них
+SYNTHETIC_MAPS = {"synthetic_64x64": (64, 64, 40), "synthetic_256x256": (256, 256, 400)}
+
+# Розміри таблиці лідерів для вимірювання бази даних
+DB_ROWS = (10_000, 100_000, 1_000_000)
+QUICK_DB_ROWS = (10_000,)
+
+# Допустиме сповільнення відносно базового прогону (0.1 — на 10%)
+DEFAULT_THRESHOLD = 0.10
+
+
+def measure(func, repeat=5, number=1, setup=None):
+    # Час однієї операції у мікросекундах: медіана та мінімум з repeat вимірювань,
+    # кожне з яких — number викликів func(); setup() викликається перед вимірюванням
+    samples = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        started = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - started) / number * 1e6)
+    return {"median_us": statistics.median(samples), "min_us": min(samples), "ops": repeat * number}
+
+
+def per_operation(stats, count):
+    # Переведення часу виклику, що виконує count операцій, у час однієї операції
+    return dict(stats, median_us=stats["median_us"] / count, min_us=stats["min_us"] / count,
+                ops=stats["ops"] * count)
+
+
+def random_moves(count, seed=2024):
+    rng = random.Random(seed)
+    names = list(DIRECTIONS)
+    return [rng.choice(names) for _ in range(count)]
+
+
+def make_synthetic_level(width, height, boxes, seed=2024):
+    # Прямокутна кімната зі стінами по краях, випадковими стінами всередині,
+    # ящиками й цілями (далеко від стін, щоб ходи не блокувалися одразу)
+    rng = random.Random(seed)
+    rows = [["#"] * width] + [["#"] + [" "] * (width - 2) + ["#"] for _ in range(height - 2)] + [["#"] * width]
+    for _ in range(width * height // 20):
+        rows[rng.randrange(1, height - 1)][rng.randrange(1, width - 1)] = "#"
+    free = [(x, y) for y in range(2, height - 2) for x in range(2, width - 2) if rows[y][x] == " "]
+    rng.shuffle(free)
+    for x, y in free[:boxes]:
+        rows[y][x] = "$"
+    for x, y in free[boxes:2 * boxes]:
+        rows[y][x] = "."
+    x, y = free[2 * boxes]
+    rows[y][x] = "@"
+    return "\n".join("".join(row) for row in rows) + "\n"
+
+
+class SyntheticLevels:
+    # Тимчасова папка з синтетичними рівнями, підключена як джерело рівнів GameLogic
+    def __enter__(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        for name, (width, height, boxes) in SYNTHETIC_MAPS.items():
+            with open(os.path.join(self._tmp.name, name + ".txt"), "w", encoding="utf-8") as f:
+                f.write(make_synthetic_level(width, height, boxes))
+        self._previous = game_logic_module.level_cache
+        game_logic_module.level_cache = LevelCache(self._tmp.name)
+        return [name + ".txt" for name in SYNTHETIC_MAPS]
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        game_logic_module.level_cache = self._previous
+        self._tmp.cleanup()
+
+
+def level_files(levels_dir="levels"):
+    return sorted(name for name in os.listdir(levels_dir) if name.endswith(".txt"))
+
+
+def _walk(game, moves):
+    for direction in moves:
+        game.move_player(*DIRECTIONS[direction], direction)
+
+
+def bench_logic(results, levels, quick=False):
+    # move_player, undo/redo, reset_level, check_win на кожному рівні
+    moves = random_moves(500 if quick else 2000)
+    for level in levels:
+        name = level.rsplit(".", 1)[0]
+        game = GameLogic()
+        results[f"logic.{name}.reset_level"] = measure(lambda: game.reset_level(level), number=5 if quick else 20)
+        results[f"logic.{name}.move_player"] = per_operation(
+            measure(lambda: _walk(game, moves), setup=lambda: game.reset_level(level)), len(moves))
+
+        def undo_redo():
+            for _ in range(game.history_index):
+                game.undo()
+            while game.history_index < len(game.history) - 1:
+                game.redo()
+        game.reset_level(level)
+        _walk(game, moves)
+        results[f"logic.{name}.undo_redo"] = per_operation(measure(undo_redo), max(1, 2 * game.history_index))
+        results[f"logic.{name}.check_win"] = measure(game.check_win, number=10_000)
+
+
+def bench_persistence(results, levels, quick=False):
+    # save_state_to_binary (повний запис і дописування) та load_state_from_binary
+    moves = random_moves(2000 if quick else 20_000)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "state.bin")
+        for level in levels:
+            name = level.rsplit(".", 1)[0]
+            game = GameLogic()
+            game.reset_level(level)
+            _walk(game, moves)
+
+            def save_full():
+                game.saved_file = None
+                game.save_state_to_binary(path)
+            results[f"persistence.{name}.save_full"] = measure(save_full)
+
+            def save_append():
+                _walk(game, moves[:10])
+                game.save_state_to_binary(path)
+            results[f"persistence.{name}.save_append"] = measure(save_append, setup=save_full)
+
+            loaded = GameLogic()
+            save_full()
+            results[f"persistence.{name}.load"] = measure(lambda: loaded.load_state_from_binary(path))
+
+
+def bench_render(results, levels, quick=False):
+    # GameRenderer.draw_game, draw_preview та draw_minimap (після ходу) на dummy-дисплеї
+    import pygame
+    from game_render import GameRenderer
+    pygame.init()
+    screen = pygame.display.set_mode((800, 600))
+    renderer = GameRenderer(screen, 64)
+    moves = random_moves(200 if quick else 1000)
+    number = 20 if quick else 100
+    for level in levels:
+        name = level.rsplit(".", 1)[0]
+        game = GameLogic()
+        game.reset_level(level)
+        results[f"render.{name}.draw_game"] = measure(lambda: renderer.draw_game(game, 0), number=number)
+        results[f"render.{name}.draw_preview"] = measure(lambda: renderer.draw_preview(game, 0), number=number)
+        steps = itertools.cycle(moves)
+
+        def move_and_minimap():
+            direction = next(steps)
+            game.move_player(*DIRECTIONS[direction], direction)
+            renderer.draw_minimap(game)
+        results[f"render.{name}.draw_minimap"] = measure(move_and_minimap, number=number)
+    pygame.quit()
+
+
+def seed_database(rows, levels=5, seed=2024):
+    # Таблиця лідерів з rows записами: rows / levels гравців, по результату на рівень
+    import database
+    database.init_database()
+    rng = random.Random(seed)
+    users = rows // levels
+    with db_utils.DatabaseManager() as cursor:
+        cursor.executemany("INSERT INTO users (username, password) VALUES (?, ?)",
+                           ((f"user{i}", "x") for i in range(users)))
+        cursor.executemany("INSERT INTO leaderboard (user_id, level, steps) VALUES (?, ?, ?)",
+                           ((user, level, rng.randint(20, 5000))
+                            for user in range(1, users + 1) for level in range(1, levels + 1)))
+    return users
+
+
+def bench_database(results, sizes):
+    # save_score та get_leaderboard на заповнених базах у тимчасовій папці
+    import database
+    previous = db_utils.DB_NAME
+    rng = random.Random(7)
+    try:
+        for rows in sizes:
+            with tempfile.TemporaryDirectory() as tmp:
+                db_utils.DB_NAME = os.path.join(tmp, "bench.db")
+                users = seed_database(rows)
+                repeat = 3 if rows >= 1_000_000 else 5
+                results[f"db.{rows}.save_score"] = measure(
+                    lambda: database.save_score(rng.randint(1, users), rng.randint(1, 5), rng.randint(10, 5000)),
+                    repeat=repeat, number=50)
+                results[f"db.{rows}.get_leaderboard"] = measure(
+                    lambda: database.get_leaderboard(rng.randint(1, 5)), repeat=repeat, number=20)
+                results[f"db.{rows}.get_all_leaderboards"] = measure(
+                    lambda: database.get_all_leaderboards(10), repeat=repeat)
+                db_utils.close_connections()
+    finally:
+        db_utils.close_connections()
+        db_utils.DB_NAME = previous
+        database.leaderboard_service.invalidate()
+
+
+def bench_startup(results, quick=False):
+    # Час від запуску main.py до першого кадру (SOKOBAN_STARTUP_CHECK) і повний час процесу.
+    # Гра запускається в тимчасовій папці з посиланнями на рівні та зображення (або їх
+    # копіями, де посилань не створити), щоб не чіпати автозбереження й базу; перший
+    # запуск прогріває кеш шрифтів і байткод
+    root = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ, SOKOBAN_STARTUP_CHECK="1", SDL_VIDEODRIVER="dummy", PYGAME_HIDE_SUPPORT_PROMPT="1")
+    first_frame, process = [], []
+    with tempfile.TemporaryDirectory() as tmp:
+        for name in ("levels", "images"):
+            try:
+                os.symlink(os.path.join(root, name), os.path.join(tmp, name))
+            except OSError:
+                # Windows без прав на символьні посилання — копія папки
+                shutil.copytree(os.path.join(root, name), os.path.join(tmp, name))
+        for run_index in range(1 + (3 if quick else 10)):
+            started = time.perf_counter()
+            output = subprocess.run([sys.executable, os.path.join(root, "main.py")], cwd=tmp, env=env,
+                                    capture_output=True, text=True, check=True).stdout
+            elapsed = (time.perf_counter() - started) * 1e6
+            if run_index:
+                first_frame.append(float(output.split("first_frame_ms")[1].split()[0]) * 1000)
+                process.append(elapsed)
+    for name, samples in (("first_frame", first_frame), ("process", process)):
+        results[f"startup.{name}"] = {"median_us": statistics.median(samples), "min_us": min(samples),
+                                      "ops": len(samples)}
+
+
+def run(groups, quick=False, db_sizes=None):
+    results = {}
+    with SyntheticLevels() as synthetic:
+        levels = level_files() + synthetic
+        if "logic" in groups:
+            bench_logic(results, levels, quick)
+        if "persistence" in groups:
+            bench_persistence(results, levels, quick)
+        if "render" in groups:
+            bench_render(results, levels, quick)
+    if "startup" in groups:
+        bench_startup(results, quick)
+    if "db" in groups:
+        bench_database(results, db_sizes or (QUICK_DB_ROWS if quick else DB_ROWS))
+    return {
+        "meta": {
+            "time": time.time(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "sqlite": sqlite3.sqlite_version,
+            "quick": quick,
+        },
+        "results": results,
+    }
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    # Порівняння медіан з базовим прогоном; повертає список регресій
+    regressions = []
+    for name, stats in sorted(current["results"].items()):
+        base = baseline["results"].get(name)
+        if not base or not base["median_us"]:
+            continue
+        ratio = stats["median_us"] / base["median_us"]
+        mark = "REGRESSION" if ratio > 1 + threshold else ""
+        print(f"{name:55s} {base['median_us']:12.2f} -> {stats['median_us']:12.2f} us  x{ratio:5.2f} {mark}")
+        if mark:
+            regressions.append({"name": name, "ratio": ratio})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Вимірювання швидкодії Sokoban")
+    parser.add_argument("-o", "--output", default="benchmark.json", help="файл результатів (JSON)")
+    parser.add_argument("--baseline", help="JSON попереднього прогону для порівняння")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="допустиме сповільнення (0.1 = 10%%)")
+    parser.add_argument("--groups", default="logic,persistence,render,db,startup",
+                        help="групи вимірювань через кому")
+    parser.add_argument("--db-rows", help="розміри баз через кому (за замовчуванням 10k,100k,1M)")
+    parser.add_argument("--quick", action="store_true", help="короткий прогін")
+    args = parser.parse_args(argv)
+
+    output = os.path.abspath(args.output)
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+    # Рівні, зображення та база шукаються відносно папки гри
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    db_sizes = [int(rows) for rows in args.db_rows.split(",")] if args.db_rows else None
+    report = run(set(args.groups.split(",")), args.quick, db_sizes)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    if baseline_path:
+        with open(baseline_path, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"Регресій: {len(regressions)}", file=sys.stderr)
+            return 1
+    else:
+        for name, stats in sorted(report["results"].items()):
+            print(f"{name:55s} {stats['median_us']:12.2f} us")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
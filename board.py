@@ -0,0 +1,162 @@
+# Компактне представлення ігрового поля: одна плоска таблиця байтів,
+# де кожна клітинка — набір бітових прапорців.
+WALL = 1
+GOAL = 2
+BOX = 4
+PLAYER = 8
+VOID = 16  # клітинка за межами короткого рядка
+
+# Символи рівня -> прапорці
+TILE_FLAGS = {
+    "#": WALL,
+    ".": GOAL,
+    "$": BOX,
+    "*": BOX | GOAL,
+    "@": PLAYER,
+    "+": PLAYER | GOAL,
+    " ": 0,
+}
+
+# Прапорці -> символ (ящик на цілі показується як "$", ціль відстежується окремо)
+FLAG_CHARS = tuple(
+    "#" if flags & WALL else
+    "$" if flags & BOX else
+    "@" if flags & PLAYER else
+    "." if flags & GOAL else
+    " "
+    for flags in range(32)
+)
+
+
+class Board:
+    # Поле рівня: ширина зберігається один раз, клітинка (x, y) має індекс y * width + x
+    __slots__ = ("width", "height", "row_lengths", "cells", "_rows")
+
+    def __init__(self, width, height, row_lengths, cells):
+        self.width = width
+        self.height = height
+        self.row_lengths = row_lengths
+        self.cells = cells
+        self._rows = None
+
+    # Створює поле зі списку рядків (рядки можуть бути різної довжини).
+    @classmethod
+    def from_rows(cls, rows, goals=()):
+        height = len(rows)
+        width = max((len(row) for row in rows), default=0)
+        cells = bytearray([VOID]) * (width * height)
+        for y, row in enumerate(rows):
+            base = y * width
+            for x, ch in enumerate(row):
+                cells[base + x] = TILE_FLAGS.get(ch, 0)
+        for x, y in goals:
+            cells[y * width + x] |= GOAL
+        return cls(width, height, tuple(len(row) for row in rows), cells)
+
+    # Повертає поле як список списків символів (старий формат рівня).
+    def to_rows(self):
+        return [list(row) for row in self.rows]
+
+    # Дешева копія: спільні розміри, власна таблиця клітинок.
+    def copy(self):
+        return Board(self.width, self.height, self.row_lengths, bytearray(self.cells))
+
+    # Копія клітинок з рамкою з VOID-клітинок навколо поля:
+    # з такою рамкою сусідні індекси ніколи не виходять за межі таблиці.
+    def padded(self):
+        width = self.width + 2
+        cells = bytearray([VOID]) * (width * (self.height + 2))
+        for y in range(self.height):
+            start = (y + 1) * width + 1
+            cells[start:start + self.width] = self.cells[y * self.width:(y + 1) * self.width]
+        return cells, width
+
+    def index(self, x, y):
+        return y * self.width + x
+
+    def position(self, index):
+        return index % self.width, index // self.width
+
+    # Чи лежить (x, y) всередині рядка рівня.
+    def contains(self, x, y):
+        return 0 <= y < self.height and 0 <= x < self.row_lengths[y]
+
+    # Позиції всіх клітинок з прапорцем flag.
+    def positions(self, flag):
+        width = self.width
+        return {(i % width, i // width) for i, cell in enumerate(self.cells) if cell & flag}
+
+    # Перегляд поля як списку рядків символів для старого коду (level[y][x]).
+    @property
+    def rows(self):
+        if self._rows is None:
+            self._rows = BoardRows(self)
+        return self._rows
+
+    def __getstate__(self):
+        return (self.width, self.height, self.row_lengths, bytes(self.cells))
+
+    def __setstate__(self, state):
+        width, height, row_lengths, cells = state
+        self.__init__(width, height, row_lengths, bytearray(cells))
+
+
+class BoardRows:
+    # Послідовність рядків поля
+    __slots__ = ("_board",)
+
+    def __init__(self, board):
+        self._board = board
+
+    def __len__(self):
+        return self._board.height
+
+    def __getitem__(self, y):
+        if isinstance(y, slice):
+            return [BoardRow(self._board, i) for i in range(*y.indices(len(self)))]
+        if y < 0:
+            y += self._board.height
+        if not 0 <= y < self._board.height:
+            raise IndexError("Рядок поза межами карти")
+        return BoardRow(self._board, y)
+
+    def __iter__(self):
+        board = self._board
+        return (BoardRow(board, y) for y in range(board.height))
+
+
+class BoardRow:
+    # Рядок поля, що читає і пише символи прямо в таблицю клітинок
+    __slots__ = ("_board", "_start", "_length")
+
+    def __init__(self, board, y):
+        self._board = board
+        self._start = y * board.width
+        self._length = board.row_lengths[y]
+
+    def __len__(self):
+        return self._length
+
+    def _index(self, x):
+        if x < 0:
+            x += self._length
+        if not 0 <= x < self._length:
+            raise IndexError("Клітинка поза межами рядка")
+        return self._start + x
+
+    def __getitem__(self, x):
+        if isinstance(x, slice):
+            return [self[i] for i in range(*x.indices(self._length))]
+        return FLAG_CHARS[self._board.cells[self._index(x)]]
+
+    def __setitem__(self, x, ch):
+        cells = self._board.cells
+        i = self._index(x)
+        cells[i] = (cells[i] & GOAL) | TILE_FLAGS.get(ch, 0)
+
+    def __iter__(self):
+        start = self._start
+        return map(FLAG_CHARS.__getitem__, self._board.cells[start:start + self._length])
+
+    def __eq__(self, other):
+        return list(self) == list(other)
@@ -22,8 +22,38 @@ def init_database():
                     FOREIGN KEY (user_id) REFERENCES users (id)
                 )
             ''')
+            migrate_schema(cursor)
     # Збереження змін
 
+# Версія схеми зберігається в PRAGMA user_version
+SCHEMA_VERSION = 1
+
+def migrate_schema(cursor):
+    # Поступове оновлення схеми старих баз до SCHEMA_VERSION
+    cursor.execute("PRAGMA user_version")
+    version = cursor.fetchone()[0]
+    if version < 1:
+        # У старих базах могли лишитися дублікати — залишаємо найкращий результат
+        cursor.execute('''
+            DELETE FROM leaderboard WHERE id NOT IN (
+                SELECT id FROM (
+                    SELECT id, ROW_NUMBER() OVER (
+                        PARTITION BY user_id, level ORDER BY steps ASC, id ASC
+                    ) AS place
+                    FROM leaderboard
+                ) WHERE place = 1
+            )
+        ''')
+        # Один результат на гравця і рівень; індекс для ТОП-N за рівнем
+        cursor.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_leaderboard_user_level ON leaderboard (user_id, level)"
+        )
+        cursor.execute(
+            "CREATE INDEX IF NOT EXISTS idx_leaderboard_level_steps ON leaderboard (level, steps)"
+        )
+    if version < SCHEMA_VERSION:
+        cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
 @db_transaction
 def register_user(cursor, username, password):
     # Реєстрація нового користувача. 
@@ -54,24 +84,19 @@ def login_user(cursor, username, password):
 
 def save_score(user_id, level, steps):
     # Збереження результату гри
-    with DatabaseManager() as cursor:
-        cursor.execute(
-            "SELECT steps FROM leaderboard WHERE user_id = ? AND level = ?",
-            (user_id, level)
-        )
-        existing = cursor.fetchone()
+    save_scores([(user_id, level, steps)])
 
-        # зберігаємо тільки кращий результат
-        if existing is None or steps < existing[0]:
-            if existing:
-                cursor.execute(
-                    "DELETE FROM leaderboard WHERE user_id = ? AND level = ?",
-                    (user_id, level)
-                )
-            cursor.execute(
-                "INSERT INTO leaderboard (user_id, level, steps) VALUES (?, ?, ?)",
-                (user_id, level, steps)
-            )
+def save_scores(scores):
+    # Збереження кількох результатів (user_id, level, steps) однією транзакцією
+    with DatabaseManager() as cursor:
+        # зберігаємо тільки кращий результат — один запит замість SELECT/DELETE/INSERT
+        cursor.executemany('''
+            INSERT INTO leaderboard (user_id, level, steps) VALUES (?, ?, ?)
+            ON CONFLICT (user_id, level) DO UPDATE
+            SET steps = excluded.steps, timestamp = CURRENT_TIMESTAMP
+            WHERE excluded.steps < leaderboard.steps
+        ''', scores)
+    leaderboard_service.invalidate()
 
 # Отримує ТОП-10 гравців для конкретного рівня
 @db_transaction
@@ -86,4 +111,60 @@ def get_leaderboard(cursor, level):
         ORDER BY leaderboard.steps ASC
         LIMIT 10
     ''', (level,))
-    return cursor.fetchall()
\ No newline at end of file
+    return cursor.fetchall()
+
+# Отримує ТОП-N гравців для всіх рівнів одним запитом
+@db_transaction
+def get_all_leaderboards(cursor, limit=10):
+    # Отримання таблиць лідерів усіх рівнів: {рівень: [(гравець, кроки), ...]}
+    # Рівні перебираються рекурсивно за індексом (level, steps), і для кожного
+    # читаються лише перші limit записів — без обходу всієї таблиці
+    cursor.execute('''
+        WITH RECURSIVE levels(level) AS (
+            SELECT MIN(level) FROM leaderboard
+            UNION ALL
+            SELECT (SELECT MIN(level) FROM leaderboard WHERE level > levels.level)
+            FROM levels WHERE levels.level IS NOT NULL
+        )
+        SELECT leaderboard.level, users.username, leaderboard.steps
+        FROM levels
+        JOIN leaderboard ON leaderboard.id IN (
+            SELECT top.id FROM leaderboard AS top
+            JOIN users AS player ON top.user_id = player.id
+            WHERE top.level = levels.level
+            ORDER BY top.steps ASC, top.id ASC
+            LIMIT ?
+        )
+        JOIN users ON leaderboard.user_id = users.id
+        ORDER BY leaderboard.level, leaderboard.steps, leaderboard.id
+    ''', (limit,))
+    leaderboards = {}
+    for level, username, steps in cursor.fetchall():
+        leaderboards.setdefault(level, []).append((username, steps))
+    return leaderboards
+
+class LeaderboardService:
+    # Кеш таблиць лідерів: усі рівні завантажуються одним запитом,
+    # кеш скидається лише після запису нового результату
+    # (запис може відбуватися у фоновому потоці — див. score_writer)
+    def __init__(self, limit=10):
+        self.limit = limit
+        self._leaderboards = None
+        self._version = 0
+
+    def get(self, level):
+        # Таблиця лідерів рівня з пам'яті
+        leaderboards = self._leaderboards
+        if leaderboards is None:
+            version = self._version
+            leaderboards = get_all_leaderboards(self.limit)
+            # якщо під час запиту з'явився новий результат, не кешуємо застарілі дані
+            if version == self._version:
+                self._leaderboards = leaderboards
+        return leaderboards.get(level, [])
+
+    def invalidate(self):
+        self._version += 1
+        self._leaderboards = None
+
+leaderboard_service = LeaderboardService()
@@ -1,15 +1,44 @@
 import sqlite3
+import threading
 from functools import wraps
 
+# Файл бази даних за замовчуванням (інструменти, як-от benchmark, можуть його змінити)
+DB_NAME = 'sokoban.db'
+
+# З'єднання живуть по одному на потік і базу та перевикористовуються між викликами
+_local = threading.local()
+
+def get_connection(db_name=None):
+    #Постійне з'єднання поточного потоку з налаштованим SQLite
+    db_name = db_name or DB_NAME
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(db_name)
+    if conn is None:
+        # cached_statements — кеш підготовлених запитів з'єднання
+        conn = sqlite3.connect(db_name, cached_statements=256)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        connections[db_name] = conn
+    return conn
+
+def close_connections():
+    #Закриття всіх з'єднань поточного потоку (при завершенні гри або потоку)
+    connections = getattr(_local, "connections", None)
+    while connections:
+        _, conn = connections.popitem()
+        conn.close()
+
 class DatabaseManager:
-    #Технічний клас для керування з'єднанням з БД
-    def __init__(self, db_name='sokoban.db'):
+    #Технічний клас для керування транзакцією на постійному з'єднанні з БД
+    def __init__(self, db_name=None):
         self.db_name = db_name
         self.conn = None
         self.cursor = None
 
     def __enter__(self):
-        self.conn = sqlite3.connect(self.db_name)
+        self.conn = get_connection(self.db_name)
         self.cursor = self.conn.cursor()
         return self.cursor
 
@@ -18,7 +47,7 @@ class DatabaseManager:
             self.conn.commit()
         else:
             self.conn.rollback()
-        self.conn.close()
+        self.cursor.close()
 
 def db_transaction(func):
     #Декоратор для автоматизації транзакцій
@@ -26,4 +55,4 @@ def db_transaction(func):
     def wrapper(*args, **kwargs):
         with DatabaseManager() as cursor:
             return func(cursor, *args, **kwargs)
-    return wrapper
\ No newline at end of file
+    return wrapper
@@ -0,0 +1,66 @@
+import json
+import os
+import pygame
+
+# Кеш пошуку системних шрифтів.
+# pygame.font.SysFont при першому виклику перелічує всі шрифти системи (fc-list,
+# реєстр Windows), що помітно затримує запуск. Тут знайдений файл шрифту для
+# (назва, жирний) зберігається на диску, і наступні запуски відкривають його
+# напряму через pygame.font.Font. Запис: шлях (None — вбудований шрифт pygame)
+# і чи потрібно штучне потовщення, як його вирішив SysFont.
+FONT_CACHE = ".font_cache.json"
+
+
+class FontCache:
+    def __init__(self, path=FONT_CACHE):
+        self.path = path
+        self._entries = None
+        self._changed = False
+
+    def _load(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                entries = json.load(f)
+            self._entries = entries if isinstance(entries, dict) else {}
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def resolve(self, name, bold=False):
+        # (шлях до файлу шрифту, штучне потовщення) для назви name
+        if self._entries is None:
+            self._load()
+        key = f"{name}|{int(bool(bold))}"
+        entry = self._entries.get(key)
+        if not (isinstance(entry, list) and len(entry) == 2
+                and (entry[0] is None or os.path.isfile(entry[0]))):
+            found = pygame.font.SysFont(name, 1, bold,
+                                        constructor=lambda path, size, fake_bold, fake_italic: (path, fake_bold))
+            entry = list(found)
+            self._entries[key] = entry
+            self._changed = True
+        return entry
+
+    def get(self, name, size, bold=False):
+        # Шрифт, такий самий, як pygame.font.SysFont(name, size, bold)
+        path, fake_bold = self.resolve(name, bold)
+        font = pygame.font.Font(path, size)
+        if fake_bold:
+            font.set_bold(True)
+        return font
+
+    def save(self):
+        # Запис нових знайдених шрифтів (помилки запису не заважають грі)
+        if not self._changed:
+            return
+        try:
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False, indent=2)
+            os.replace(tmp, self.path)
+            self._changed = False
+        except OSError:
+            pass
+
+
+# Спільний кеш для рендерера
+font_cache = FontCache()
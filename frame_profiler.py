@@ -0,0 +1,112 @@
+import json
+import time
+
+# Фази кадру SokobanApp.run у порядку виконання
+PHASES = ("timers", "events", "logic", "draw", "flip", "tick", "wait")
+# Фази очікування, що не входять у час роботи кадру
+IDLE_PHASES = ("tick", "wait")
+
+
+def _percentile(values, fraction):
+    # Перцентиль за найближчим рангом для відсортованого списку
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+def _describe(values_ns):
+    values = sorted(value / 1e6 for value in values_ns)
+    return {
+        "frames": len(values),
+        "mean_ms": sum(values) / len(values) if values else 0.0,
+        "p50_ms": _percentile(values, 0.5),
+        "p95_ms": _percentile(values, 0.95),
+        "p99_ms": _percentile(values, 0.99),
+        "max_ms": values[-1] if values else 0.0,
+    }
+
+
+class FrameProfiler:
+    # Час фаз кількох останніх кадрів у кільцевому буфері.
+    # Кадр: begin(state), mark(фаза) після кожної фази, end().
+    # Запис кадру — (стан, тривалості фаз у нс); "tick" — очікування clock.tick,
+    # "wait" — простій у pygame.event.wait, поки екран не потребує перемальовування.
+    # Записуються лише ітерації, що малювали кадр.
+
+    def __init__(self, capacity=600):
+        self.capacity = capacity
+        self._frames = [None] * capacity
+        self._next = 0
+        self._count = 0
+        self._state = None
+        self._durations = [0] * len(PHASES)
+        self._last = 0
+        self._phase_index = {name: i for i, name in enumerate(PHASES)}
+        self._cached_summary = None
+        self._cached_at = 0.0
+        # Час від запуску гри до першого показаного кадру, мс
+        self.first_frame_ms = None
+
+    def begin(self, state):
+        self._state = state
+        self._durations = [0] * len(PHASES)
+        self._last = time.perf_counter_ns()
+
+    def mark(self, phase):
+        now = time.perf_counter_ns()
+        self._durations[self._phase_index[phase]] += now - self._last
+        self._last = now
+
+    def end(self, drawn=True):
+        # Ітерації без перемальовування (простій) кадрами не вважаються
+        if not drawn:
+            return
+        self._frames[self._next] = (self._state, tuple(self._durations))
+        self._next = (self._next + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def frames(self):
+        # Записані кадри від найстарішого
+        if self._count < self.capacity:
+            return self._frames[:self._count]
+        return self._frames[self._next:] + self._frames[:self._next]
+
+    def summary(self):
+        # Статистика фаз і часу кадру за станами гри
+        frames = self.frames()
+        phases = {name: _describe([durations[i] for _, durations in frames])
+                  for i, name in enumerate(PHASES)}
+        # Час кадру — сума фаз без очікування (tick, wait)
+        idle = [self._phase_index[name] for name in IDLE_PHASES]
+        totals = [sum(durations) - sum(durations[i] for i in idle) for _, durations in frames]
+        by_state = {}
+        for (state, _), total in zip(frames, totals):
+            by_state.setdefault(state, []).append(total)
+        work = _describe(totals)
+        return {
+            "frames": len(frames),
+            "phases": phases,
+            "work": work,
+            "states": {state: _describe(totals) for state, totals in by_state.items()},
+            "first_frame_ms": self.first_frame_ms,
+        }
+
+    def summary_due(self, max_age=0.5):
+        # Чи застаріла статистика оверлею
+        return self._cached_summary is None or time.monotonic() - self._cached_at >= max_age
+
+    def recent_summary(self, max_age=0.5):
+        # Статистика, що перераховується не частіше, ніж раз на max_age секунд (для оверлею)
+        if self.summary_due(max_age):
+            self._cached_summary, self._cached_at = self.summary(), time.monotonic()
+        return self._cached_summary
+
+    def dump(self, path):
+        # Запис статистики та сирих часів кадрів у JSON
+        data = self.summary()
+        data["time"] = time.time()
+        data["phase_names"] = list(PHASES)
+        data["raw_ns"] = [[state, *durations] for state, durations in self.frames()]
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False)
+        return path
@@ -5,6 +5,7 @@ class GameObject:
         self._x = x 
         self._y = y
         self._symbol = symbol
+        self._collections = []
     
     # Повертає координату X об’єкта.
     @property
@@ -17,7 +18,7 @@ class GameObject:
     def x(self, value):
         if value < 0:
             raise ValueError("Координата не може бути від'ємною")
-        self._x = value
+        self._relocate(value, self._y)
     
     # Повертає координату Y об’єкта.
     @property
@@ -30,7 +31,7 @@ class GameObject:
     def y(self, value):
         if value < 0:
             raise ValueError("Координата не може бути від'ємною")
-        self._y = value
+        self._relocate(self._x, value)
     
     # Повертає символ об’єкта.
     @property
@@ -44,6 +45,14 @@ class GameObject:
     # Позиція як кортеж
         return (self._x, self._y)
     
+    # Змінює позицію та оновлює індекси колекцій, у яких лежить об’єкт.
+    def _relocate(self, x, y):
+        old_position = (self._x, self._y)
+        self._x = x
+        self._y = y
+        for collection in self._collections:
+            collection._reindex(self, old_position)
+    
     # Порівнює два об’єкти по координатах. Повертає True, якщо x і y однакові.
     def __eq__(self, other):
     # Порівняння двох об'єктів
@@ -82,8 +91,7 @@ class Player(GameObject):
     # Переміщує гравця на dx, dy і змінює напрямок, збільшує лічильник ходів.
     def move(self, dx, dy, direction):
         # Переміщення гравця
-        self._x += dx
-        self._y += dy
+        self._relocate(self._x + dx, self._y + dy)
         self._direction = direction
         self._moves_count += 1
 
@@ -111,8 +119,7 @@ class Box(GameObject):
     # Переміщує ящик на dx, dy (штовхання).
     def push(self, dx, dy):
         # Штовхнути ящик
-        self._x += dx
-        self._y += dy
+        self._relocate(self._x + dx, self._y + dy)
 
 
 class Goal(GameObject):
@@ -233,9 +240,10 @@ class AdvancedBox(Box, SerializableMixin):
 class GameObjectCollection:
     # Колекція ігрових об'єктів
     
-    # Створює порожню колекцію об’єктів.
+    # Створює порожню колекцію об’єктів та індекс за координатами.
     def __init__(self):
         self._objects = []
+        self._by_position = {}
     
     # Додає об’єкт у колекцію.
     def add(self, obj):
@@ -243,11 +251,37 @@ class GameObjectCollection:
         if not isinstance(obj, GameObject):
             raise TypeError("Можна додавати тільки GameObject")
         self._objects.append(obj)
+        self._attach(obj)
     
     # Видаляє об’єкт з колекції.
     def remove(self, obj):
         # Видалити об'єкт
         self._objects.remove(obj)
+        self._detach(obj)
+    
+    # Вносить об’єкт в індекс і підписує колекцію на його переміщення.
+    def _attach(self, obj):
+        self._by_position.setdefault(obj.position, []).append(obj)
+        obj._collections.append(self)
+    
+    # Прибирає об’єкт з індексу.
+    def _detach(self, obj):
+        self._unindex(obj, obj.position)
+        obj._collections.remove(self)
+    
+    def _unindex(self, obj, position):
+        bucket = self._by_position[position]
+        for i, item in enumerate(bucket):
+            if item is obj:
+                del bucket[i]
+                break
+        if not bucket:
+            del self._by_position[position]
+    
+    # Переносить об’єкт у індексі після зміни його позиції.
+    def _reindex(self, obj, old_position):
+        self._unindex(obj, old_position)
+        self._by_position.setdefault(obj.position, []).append(obj)
     
     # Повертає кількість об’єктів у колекції.
     def __len__(self):
@@ -269,7 +303,9 @@ class GameObjectCollection:
         # Встановлення за індексом
         if not isinstance(value, GameObject):
             raise TypeError("Можна додавати тільки GameObject")
+        self._detach(self._objects[index])
         self._objects[index] = value
+        self._attach(value)
     
     # Перевіряє, чи є об’єкт у колекції.
     def __contains__(self, obj):
@@ -283,10 +319,8 @@ class GameObjectCollection:
     # Повертає об’єкт за координатами (x, y).
     def get_by_position(self, x, y):
         # Отримати об'єкт за позицією
-        for obj in self._objects:
-            if obj.x == x and obj.y == y:
-                return obj
-        return None
+        bucket = self._by_position.get((x, y))
+        return bucket[0] if bucket else None
     
     # Повертає список об’єктів, відсортованих по позиції (тільки ті, що мають ComparableMixin).
     def sort_by_position(self):
@@ -1,5 +1,9 @@
 import os
-import pickle
+import struct
+import savefile
+from board import Board, WALL, GOAL, BOX, PLAYER
+from level_cache import level_cache
+from level_tables import LevelTables
 from game_entities import (
     AdvancedPlayer, AdvancedBox, Goal, Wall, 
     GameObjectCollection,
@@ -8,124 +12,268 @@ from game_entities import (
 total_games_played = 0
 total_steps_made = 0
 
-# Декоратор для логування викликів функцій
-def log_call(func):
-    def wrapper(*args, **kwargs):
-        print(f"[LOG] Виклик: {func.__name__}")
-        return func(*args, **kwargs)
-    return wrapper
+# Кожна CHECKPOINT_INTERVAL-та позиція історії зберігається повним знімком
+CHECKPOINT_INTERVAL = 256
 
 class GameLogic:
     # Клас для керування ігровою логікою
     
     def __init__(self):
-        self.level = []
+        self.board = Board.from_rows([])
         self.goals = set() 
         self.player_x = 0
         self.player_y = 0
         self.history = []
         self.history_index = -1
+        self.checkpoints = {}
         self.steps_count = 0
         self.current_direction = "down"
         self.visited_positions = set() 
+        # Лічильники для перевірки перемоги без обходу карти
+        self.box_count = 0
+        self.boxes_on_goals = 0
+        # Статичні таблиці рівня (мертві клітинки, відстані до цілей, коридори, кути)
+        self._tables = None
+        # Змінюється, коли змінюється планування рівня (стіни, підлога, цілі)
+        self.level_version = 0
+        # Клітинки, змінені з останнього take_changed_cells(); None — змінилось усе
+        self.changed_cells = None
+        # Файл, у який востаннє збережено гру: (ім'я, довжина історії, розмір файлу),
+        # та кількість записів історії, що не змінились з того збереження
+        self.saved_file = None
+        self.history_synced = 0
+        # Назва файлу поточного рівня та журнал автозбереження (journal.Journal)
+        self.level_filename = None
+        self.journal = None
         
         self.player_obj = None 
         self.boxes = GameObjectCollection() 
         self.goals_obj = GameObjectCollection()  
         self.walls = GameObjectCollection()  
     
-    def load_level_data(self, filename):
-        # Завантаження рівня з файлу
-        path = f"levels/{filename}"
+    def load_level_board(self, filename):
+        # Завантаження рівня з файлу через кеш скомпільованих рівнів
+        board = level_cache.load(filename)
         # Якщо файл не знайдено — повертає порожню карту 15x15 зі стінами
-        if not os.path.exists(path):
-            return [["#"]*15 for _ in range(15)]
-        with open(path, "r", encoding="utf-8") as f:
-            return [list(line.rstrip("\n")) for line in f]
+        if board is None:
+            return Board.from_rows([["#"]*15 for _ in range(15)])
+        return board
+
+    def load_level_data(self, filename):
+        # Завантаження рівня з файлу як списку рядків
+        return self.load_level_board(filename).to_rows()
+
+    @property
+    def tables(self):
+        # Статичні таблиці рівня (LevelTables) будуються при першому зверненні:
+        # звичайна гра їх не потребує, а на великих рівнях вони не безкоштовні
+        if self._tables is None:
+            self._tables = LevelTables.for_board(self.board)
+        return self._tables
+
+    @property
+    def level(self):
+        # Карта як список рядків символів (level[y][x]) поверх компактного поля
+        return self.board.rows
+
+    @level.setter
+    def level(self, rows):
+        self.board = rows.copy() if isinstance(rows, Board) else Board.from_rows(rows, self.goals)
     
-    def save_state(self):
-        # Збереження поточного стану в історію
-        state = {
-            "level": [row[:] for row in self.level],
+    def _snapshot(self):
+        # Повний знімок стану (контрольна точка історії)
+        return {
+            "board": self.board.copy(),
             "player_pos": (self.player_x, self.player_y),
             "direction": self.current_direction,
             "steps": self.steps_count
         }
+
+    def save_state(self, delta=None):
+        # Збереження поточного стану в історію.
+        # Без delta записується повний знімок, інакше — компактна дельта ходу:
+        # (звідки гравець, куди гравець, напрямок, звідки ящик, куди ящик)
         # Історія обмежується поточним станом щоб після undo не залишалося “старих” наступних станів
-        self.history = self.history[:self.history_index + 1]
-        self.history.append(state)
+        # Контрольні точки додаються за зростанням номера, тож словник упорядкований
+        # і відкинуті точки знімаються з кінця; звичайний хід нічого не перебирає
+        if self.history_index + 1 < len(self.history):
+            self.history_synced = min(self.history_synced, self.history_index + 1)
+            del self.history[self.history_index + 1:]
+            while self.checkpoints and next(reversed(self.checkpoints)) > self.history_index:
+                self.checkpoints.popitem()
         self.history_index += 1
-    
+        if delta is None or self.history_index % CHECKPOINT_INTERVAL == 0:
+            self.checkpoints[self.history_index] = self._snapshot()
+        self.history.append(delta if delta is not None else self.checkpoints[self.history_index])
+
+    def _restore_snapshot(self, state):
+        # Відновлення стану з повного знімка
+        self.level = state["board"] if "board" in state else state["level"]
+        self.player_x, self.player_y = state["player_pos"]
+        self.current_direction = state["direction"]
+        self.steps_count = state["steps"]
+
+    def _apply_delta(self, delta):
+        # Повторне застосування ходу з історії
+        player_from, player_to, direction, box_from, box_to = delta
+        cells, width = self.board.cells, self.board.width
+        cells[player_from[1] * width + player_from[0]] &= ~PLAYER
+        if box_to is not None:
+            cells[box_from[1] * width + box_from[0]] &= ~BOX
+            cells[box_to[1] * width + box_to[0]] |= BOX
+            self.boxes_on_goals += (box_to in self.goals) - (box_from in self.goals)
+            box = self.boxes.get_by_position(*box_from)
+            if box: box.push(box_to[0] - box_from[0], box_to[1] - box_from[1])
+        cells[player_to[1] * width + player_to[0]] |= PLAYER
+        self.player_x, self.player_y = player_to
+        self.current_direction = direction
+        self.steps_count += 1
+        self._mark_changed(delta)
+
+    def _revert_delta(self, delta):
+        # Скасування ходу з історії
+        player_from, player_to, direction, box_from, box_to = delta
+        cells, width = self.board.cells, self.board.width
+        cells[player_to[1] * width + player_to[0]] &= ~PLAYER
+        if box_to is not None:
+            cells[box_to[1] * width + box_to[0]] &= ~BOX
+            cells[box_from[1] * width + box_from[0]] |= BOX
+            self.boxes_on_goals += (box_from in self.goals) - (box_to in self.goals)
+            box = self.boxes.get_by_position(*box_to)
+            if box: box.push(box_from[0] - box_to[0], box_from[1] - box_to[1])
+        cells[player_from[1] * width + player_from[0]] |= PLAYER
+        self.player_x, self.player_y = player_from
+        self.steps_count -= 1
+        self._mark_changed(delta)
+
+    def _mark_changed(self, delta):
+        # Запам'ятовування клітинок, змінених ходом (для часткового перемальовування)
+        if self.changed_cells is not None:
+            self.changed_cells.add(delta[0])
+            self.changed_cells.add(delta[1])
+            if delta[4] is not None:
+                self.changed_cells.add(delta[4])
+
+    def take_changed_cells(self):
+        # Повертає змінені клітинки та очищує список; None — потрібне повне перемальовування
+        changed, self.changed_cells = self.changed_cells, set()
+        return changed
+
+    def _direction_at(self, index):
+        # Напрямок гравця у стані з індексом index
+        entry = self.history[index]
+        return entry["direction"] if isinstance(entry, dict) else entry[2]
+
+    def _count_boxes(self):
+        # Повний перерахунок ящиків (після завантаження або скидання рівня)
+        cells = self.board.cells
+        self.box_count = sum(1 for cell in cells if cell & BOX)
+        self.boxes_on_goals = sum(1 for cell in cells if cell & BOX and cell & GOAL)
+
+    def _sync_player_obj(self):
+        if self.player_obj:
+            self.player_obj.x = self.player_x
+            self.player_obj.y = self.player_y
+            self.player_obj.direction = self.current_direction
+
     def undo(self):
         # Відкат на крок назад
         if self.history_index > 0:
+            self._revert_delta(self.history[self.history_index])
             self.history_index -= 1
-            state = self.history[self.history_index]
-            self.level = [row[:] for row in state["level"]]
-            self.player_x, self.player_y = state["player_pos"]
-            self.current_direction = state["direction"]
-            self.steps_count = state["steps"]
-            
-            if self.player_obj:
-                self.player_obj.x = self.player_x
-                self.player_obj.y = self.player_y
-                self.player_obj.direction = self.current_direction
+            self.current_direction = self._direction_at(self.history_index)
+            self._sync_player_obj()
+            if self.journal:
+                self.journal.record_undo()
     
     def redo(self):
         # Відкат уперед
         if self.history_index < len(self.history) - 1:
             self.history_index += 1
-            state = self.history[self.history_index]
-            self.level = [row[:] for row in state["level"]]
-            self.player_x, self.player_y = state["player_pos"]
-            self.current_direction = state["direction"]
-            self.steps_count = state["steps"]
-            
-            if self.player_obj:
-                self.player_obj.x = self.player_x
-                self.player_obj.y = self.player_y
-                self.player_obj.direction = self.current_direction
+            self._apply_delta(self.history[self.history_index])
+            self._sync_player_obj()
+            if self.journal:
+                self.journal.record_redo()
+
+    def goto_history(self, index):
+        # Перехід до довільного стану історії: від найближчої контрольної точки
+        # або від поточного стану, якщо до нього ближче
+        if not 0 <= index < len(self.history) or index == self.history_index:
+            return
+        checkpoint = max(i for i in self.checkpoints if i <= index)
+        if abs(index - self.history_index) > index - checkpoint:
+            self._restore_snapshot(self.checkpoints[checkpoint])
+            self.changed_cells = None
+            self._build_objects()
+            self._count_boxes()
+            self.history_index = checkpoint
+        while self.history_index < index:
+            self.history_index += 1
+            self._apply_delta(self.history[self.history_index])
+        while self.history_index > index:
+            self._revert_delta(self.history[self.history_index])
+            self.history_index -= 1
+        self.current_direction = self._direction_at(self.history_index)
+        self._sync_player_obj()
+        if self.journal:
+            self.journal.record_goto(index)
     
     def reset_level(self, level_filename):
         # Скидання рівня
         global total_games_played 
         total_games_played += 1
         
-        self.level = self.load_level_data(level_filename)
-        self.goals = {(x, y) for y, row in enumerate(self.level) for x, ch in enumerate(row) if ch in [".", "*"]}
+        self.board = self.load_level_board(level_filename)
+        self.level_filename = level_filename
+        self.goals = self.board.positions(GOAL)
+        self._tables = None
+        self.level_version += 1
+        self.changed_cells = None
         self.visited_positions = set() 
         self.current_direction = "down"
         self.history = []
         self.history_index = -1
+        self.checkpoints = {}
         self.steps_count = 0
+        self.saved_file = None
         
+        for i, cell in enumerate(self.board.cells):
+            if cell & PLAYER:
+                self.player_x, self.player_y = self.board.position(i)
+                self.player_obj = AdvancedPlayer(self.player_x, self.player_y, "Герой")
+                self.visited_positions.add((self.player_x, self.player_y))
+        self._build_objects()
+        self._count_boxes()
+        
+        self.save_state()
+        if self.journal:
+            self.journal.start(self)
+
+    def _build_objects(self):
+        # Побудова колекцій ящиків, цілей і стін за поточним полем
         self.boxes = GameObjectCollection()
         self.goals_obj = GameObjectCollection()
         self.walls = GameObjectCollection()
         
-        for y, row in enumerate(self.level):
-            for x, ch in enumerate(row):
-                if ch == "@":
-                    self.player_x, self.player_y = x, y
-                    self.player_obj = AdvancedPlayer(x, y, "Герой")
-                    self.visited_positions.add((x, y))
-                elif ch == "$":
-                    box = AdvancedBox(x, y, weight=1)
-                    self.boxes.add(box)
-                elif ch in [".", "*"]:
-                    goal = Goal(x, y)
-                    self.goals_obj.add(goal)
-                elif ch == "#":
-                    wall = Wall(x, y)
-                    self.walls.add(wall)
-        
-        self.save_state()
+        width = self.board.width
+        for i, cell in enumerate(self.board.cells):
+            x, y = i % width, i // width
+            if cell & BOX:
+                box = AdvancedBox(x, y, weight=1)
+                self.boxes.add(box)
+            if cell & GOAL:
+                goal = Goal(x, y)
+                self.goals_obj.add(goal)
+            if cell & WALL:
+                wall = Wall(x, y)
+                self.walls.add(wall)
 
-    @log_call
     def move_player(self, dx: int, dy: int, direction: str) -> None:
         # Переміщення гравця (Основне завдання)
         global total_steps_made
         self.current_direction = direction
+        board = self.board
+        cells, width = board.cells, board.width
         
         # координати клітинки, куди хочемо піти
         nx, ny = self.player_x + dx, self.player_y + dy
@@ -133,99 +281,160 @@ class GameLogic:
         nnx, nny = self.player_x + 2 * dx, self.player_y + 2 * dy
 
         # Перевірка меж карти
-        if 0 <= ny < len(self.level) and 0 <= nx < len(self.level[ny]):
-            pass
-        else:
+        if not board.contains(nx, ny):
             return
    
         # Визначення цільової клітинки
-        target = self.level[ny][nx]
-        if target == "#": 
+        here = self.player_y * width + self.player_x
+        target = ny * width + nx
+        if cells[target] & WALL: 
             return
         
-        moved = False
+        delta = None
         # 
-        if target == "$":
-            if 0 <= nny < len(self.level) and 0 <= nnx < len(self.level[nny]):
-                after_box = self.level[nny][nnx]
-                if after_box in [" ", "."]:
-                    self.level[nny][nnx] = "$"
-                    self.level[ny][nx] = "@"
-                    self.level[self.player_y][self.player_x] = "." if (self.player_x, self.player_y) in self.goals else " "
+        if cells[target] & BOX:
+            if board.contains(nnx, nny):
+                after_box = nny * width + nnx
+                if not cells[after_box] & (WALL | BOX):
+                    self.boxes_on_goals += bool(cells[after_box] & GOAL) - bool(cells[target] & GOAL)
+                    cells[after_box] |= BOX
+                    cells[target] = (cells[target] & ~BOX) | PLAYER
+                    cells[here] &= ~PLAYER
+                    delta = ((self.player_x, self.player_y), (nx, ny), direction, (nx, ny), (nnx, nny))
                     self.player_x, self.player_y = nx, ny
-                    moved = True
                     
                     box = self.boxes.get_by_position(nx, ny)
                     if box: box.push(dx, dy)
         
-        elif target in [" ", "."]:
-            self.level[ny][nx] = "@"
-            self.level[self.player_y][self.player_x] = "." if (self.player_x, self.player_y) in self.goals else " "
+        else:
+            cells[target] |= PLAYER
+            cells[here] &= ~PLAYER
+            delta = ((self.player_x, self.player_y), (nx, ny), direction, None, None)
             self.player_x, self.player_y = nx, ny
-            moved = True
         
-        if moved:
+        if delta:
             self.steps_count += 1
             total_steps_made += 1
             self.visited_positions.add((self.player_x, self.player_y))
             if self.player_obj:
                 self.player_obj += 10
-            self.save_state()
+            self._mark_changed(delta)
+            self.save_state(delta)
+            if self.journal:
+                self.journal.record_move(delta)
     
     def check_win(self) -> bool:
-        # Перевірка перемоги
-        boxes_positions = {(x, y) for y, row in enumerate(self.level) for x, tile in enumerate(row) if tile == "$"}
-        return boxes_positions == self.goals
+        # Перевірка перемоги: усі ящики на цілях і кожна ціль зайнята
+        return self.boxes_on_goals == self.box_count == len(self.goals)
     
     def save_state_to_binary(self, filename="gamestate.bin"):
-        # Збереження повного стану гри в бінарний файл
-        state = {
-            "level": self.level,
-            "goals": self.goals,
-            "player_x": self.player_x,
-            "player_y": self.player_y,
-            "steps_count": self.steps_count,
-            "current_direction": self.current_direction,
-            "history": self.history,
-            "history_index": self.history_index,
-            "visited_positions": self.visited_positions,
-            "player_data": self.player_obj.to_dict() if self.player_obj else None
-        }
-        with open(filename, "wb") as f:
-            pickle.dump(state, f)
+        # Збереження стану гри в бінарний файл (формат savefile).
+        # Повторне збереження в той самий файл дописує лише зміни
+        savefile.save(self, filename)
     
     def load_state_from_binary(self, filename="gamestate.bin"):
         # Завантаження стану гри з бінарного файлу
         if not os.path.exists(filename):
             return False
+        if savefile.is_savefile(filename):
+            return self._load_savefile(filename)
+        # Старі збереження у форматі pickle (модуль імпортується лише для них)
+        import pickle
         try:
             with open(filename, "rb") as f:
                 state = pickle.load(f)
-            self.level = state["level"]
             self.goals = state["goals"]
+            self.level = state["level"]
             self.player_x = state["player_x"]
             self.player_y = state["player_y"]
             self.steps_count = state["steps_count"]
             self.current_direction = state["current_direction"]
             self.history = state["history"]
             self.history_index = state["history_index"]
+            self.checkpoints = dict(sorted((state.get("checkpoints") or {0: self.history[0]}).items()))
+            # Старі збереження містять повні знімки на кожному кроці
+            if any(isinstance(entry, dict) for entry in self.history[1:]):
+                self.history = history_from_snapshots(self.history)
             self.visited_positions = state["visited_positions"]
-            
-            if state.get("player_data"):
-                player_data = state["player_data"]
-                self.player_obj = AdvancedPlayer(
-                    player_data['x'], 
-                    player_data['y'],
-                    player_data.get('name', 'Герой')
-                )
-                self.player_obj._score = player_data.get('score', 0)
-                self.player_obj._moves_count = player_data.get('moves', 0)
-                self.player_obj._direction = player_data.get('direction', 'down')
-            
+            self._build_objects()
+            self._count_boxes()
+            self._tables = None
+            self.level_version += 1
+            self.changed_cells = None
+            self.saved_file = None
+            self._restore_player_obj(state.get("player_data"))
+            if self.journal:
+                self.journal.start(self)
             return True
         except:
             return False
 
+    def _load_savefile(self, filename):
+        # Завантаження з формату savefile: історія відтворюється з байтів ходів,
+        # контрольні точки будуються під час відтворення
+        try:
+            state = savefile.load(filename)
+        except (OSError, ValueError, IndexError, UnicodeDecodeError, struct.error):
+            return False
+        # Ходи перевіряються безголовим рушієм: пошкоджений файл не має змінити гру
+        if state is None or not savefile.check_moves(state["start"], state["moves"]):
+            return False
+        self.restore_history(state["start"], state["moves"], state["history_index"])
+        self.steps_count = state["steps_count"]
+        self.current_direction = state["current_direction"]
+        self.visited_positions = state["visited_positions"]
+        self._restore_player_obj(state["player_data"])
+        # наступне збереження в цей файл може лише дописати зміни
+        self.saved_file = (filename, len(self.history), state["size"])
+        self.history_synced = len(self.history)
+        if self.journal:
+            self.journal.start(self)
+        return True
+
+    def restore_history(self, start, moves, index):
+        # Відновлення історії зі знімка початку і байтів ходів (формат savefile)
+        # з переходом до стану index; контрольні точки будуються під час відтворення
+        self.goals = start["board"].positions(GOAL)
+        self._restore_snapshot(start)
+        self.history = [start] + savefile.decode_moves(start["player_pos"], moves)
+        self.checkpoints = {0: start}
+        self.history_index = 0
+        self.changed_cells = None
+        self._build_objects()
+        self._count_boxes()
+        for i in range(1, len(self.history)):
+            self.history_index = i
+            self._apply_delta(self.history[i])
+            if i % CHECKPOINT_INTERVAL == 0:
+                self.checkpoints[i] = self._snapshot()
+        self.goto_history(index)
+        self._tables = None
+        self.level_version += 1
+        self.changed_cells = None
+        self.saved_file = None
+
+    def _restore_player_obj(self, player_data):
+        if player_data:
+            self.player_obj = AdvancedPlayer(
+                player_data['x'], 
+                player_data['y'],
+                player_data.get('name', 'Герой')
+            )
+            self.player_obj._score = player_data.get('score', 0)
+            self.player_obj._moves_count = player_data.get('moves', 0)
+            self.player_obj._direction = player_data.get('direction', 'down')
+
+def history_from_snapshots(states):
+    # Перетворення історії з повних знімків у дельти ходів
+    history = [states[0]]
+    for prev, state in zip(states, states[1:]):
+        (px, py), (nx, ny) = prev["player_pos"], state["player_pos"]
+        box_from = box_to = None
+        if prev["level"][ny][nx] == "$":
+            box_from, box_to = (nx, ny), (2 * nx - px, 2 * ny - py)
+        history.append(((px, py), (nx, ny), state["direction"], box_from, box_to))
+    return history
+
 def get_global_statistics():
     # Отримання глобальної статистики
     global total_games_played, total_steps_made
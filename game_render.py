@@ -1,7 +1,35 @@
 import pygame
-from database import get_leaderboard
+from database import leaderboard_service
+import sprite_atlas
+from font_cache import font_cache
+from lru import LRUCache
+from board import WALL, GOAL
+from score_writer import PENDING, SAVED, FAILED
 from ui_config import UIConfig
 
+# Статичний шар рівня складається з квадратних фрагментів по STATIC_CHUNK_TILES клітинок;
+# будуються лише фрагменти, які бачить камера, і в пам'яті тримаються останні STATIC_CHUNKS
+STATIC_CHUNK_TILES = 8
+STATIC_CHUNKS = 32
+
+# Тексти стану запису результату на екрані перемоги
+SAVE_STATUS_TEXT = {
+    PENDING: ("Результат зберігається...", (200, 200, 120)),
+    SAVED: ("Результат збережено", (120, 220, 120)),
+    FAILED: ("Не вдалося зберегти результат", (240, 120, 120)),
+}
+
+class SpriteSet(dict):
+    # Спрайти, що завантажуються під час першого звернення за ключем
+    def __init__(self, loader, paths):
+        super().__init__()
+        self._loader = loader
+        self._paths = paths
+
+    def __missing__(self, key):
+        sprite = self[key] = self._loader(self._paths[key])
+        return sprite
+
 class GameRenderer:
     # Клас для відмальовування гри
     def __init__(self, screen, tile_size):
@@ -10,25 +38,61 @@ class GameRenderer:
         self.SCREEN_WIDTH = screen.get_width()
         self.SCREEN_HEIGHT = screen.get_height()
         
-        # Ініціалізація шрифтів
-        self.font = pygame.font.SysFont("Arial", 24, bold=True)
-        self.font_big = pygame.font.SysFont("Arial", 72, bold=True)
-        self.font_small = pygame.font.SysFont("Arial", 32)
-        self.font_tiny = pygame.font.SysFont("Arial", 20)
-        self.font_mini = pygame.font.SysFont("Arial", 16)
+        # Ініціалізація шрифтів (шляхи до файлів шрифтів кешуються на диску)
+        self.font = font_cache.get("Arial", 24, bold=True)
+        self.font_big = font_cache.get("Arial", 72, bold=True)
+        self.font_small = font_cache.get("Arial", 32)
+        self.font_tiny = font_cache.get("Arial", 20)
+        self.font_mini = font_cache.get("Arial", 16)
+        font_cache.save()
+        
+        # Спрайти завантажуються при першому використанні: меню їх не потребує.
+        # Усі разом беруться з атласу (sprite_atlas), якщо він актуальний
+        self._atlas = None
+        self.player_sprites = SpriteSet(self.load_sprite, {
+            "down": "player_down", "up": "player_up", "left": "player_left", "right": "player_right"
+        })
+        self.tile_sprites = SpriteSet(self.load_sprite, {
+            "wall": "wall", "floor": "floor", "box": "box", "goal": "goal"
+        })
         
-        # Завантаження спрайтів
-        self.player_sprites = {
-            "down": self.load_img("images/down/player_down_1.png"),
-            "up": self.load_img("images/up/player_up_1.png"),
-            "left": self.load_img("images/left/player_left_1.png"),
-            "right": self.load_img("images/right/player_right_1.png")
-        }
-        self.wall_img = self.load_img("images/walls/block_01.png")
-        self.floor_img = self.load_img("images/ground/ground_06.png")
-        self.box_img = self.load_img("images/boxes/crate_02.png")
-        self.goal_img = self.load_img("images/enviroment/environment_02.png")
+        # Масштабовані копії спрайтів для прев'ю, міні-карти та масштабування
+        self.sprite_cache = LRUCache(64)
+        # Растеризовані написи (меню, кнопки, підказки, HUD)
+        self.text_cache = LRUCache(256)
+        
+        # Попередньо відмальовані фрагменти статичного шару рівня (підлога, цілі, стіни)
+        self._static_chunks = LRUCache(STATIC_CHUNKS)
+        self._static_key = None
+        
+        # Поверхня міні-карти, що оновлюється по клітинках
+        self._minimap = None
+        self._minimap_key = None
+        self._minimap_cell_size = 0
+
+        # Копії сцени під оверлеями (повідомлення, профайлер) з останнього повного
+        # кадру: оверлей оновлюється чи стирається без перемальовування сцени
+        self._under = {}
     
+    wall_img = property(lambda self: self.tile_sprites["wall"])
+    floor_img = property(lambda self: self.tile_sprites["floor"])
+    box_img = property(lambda self: self.tile_sprites["box"])
+    goal_img = property(lambda self: self.tile_sprites["goal"])
+
+    def load_sprite(self, name):
+        # Спрайт з атласу; без атласу (або з застарілим) — з окремого файлу,
+        # після чого атлас перебудовується для наступних запусків
+        if self._atlas is None:
+            self._atlas = sprite_atlas.load()
+            if self._atlas is None:
+                self._atlas = {}
+                try:
+                    sprite_atlas.build()
+                except (OSError, pygame.error):
+                    pass
+        sprite = self._atlas.get(name)
+        return sprite if sprite is not None else self.load_img(sprite_atlas.SPRITES[name])
+
     def load_img(self, path):
         # Безпечне завантаження зображення
         try:
@@ -38,18 +102,32 @@ class GameRenderer:
             surf.fill((200, 0, 200))
             return surf
 
+    def _scaled(self, sprite, size):
+        # Спрайт, масштабований до size (кожен спрайт масштабується один раз на розмір)
+        scaled = self.sprite_cache.get((sprite, size))
+        if scaled is None:
+            scaled = self.sprite_cache.put((sprite, size), pygame.transform.scale(sprite, size))
+        return scaled
+
+    def _text(self, font, text, color):
+        # Растеризований напис (статичні написи растеризуються один раз)
+        surf = self.text_cache.get((font, text, color))
+        if surf is None:
+            surf = self.text_cache.put((font, text, color), font.render(text, True, color))
+        return surf
+
     def _draw_text_centered(self, text, rect, font, color=(255, 240, 240)):
-        surf = font.render(text, True, color)
+        surf = self._text(font, text, color)
         self.screen.blit(surf, (rect.centerx - surf.get_width()//2, rect.centery - surf.get_height()//2))
 
     def draw_menu(self, username):
         # Відмальовування головного меню
         self.screen.fill((40, 20, 20))
         
-        title = self.font_big.render("SOKOBAN", True, (255, 200, 200))
+        title = self._text(self.font_big, "SOKOBAN", (255, 200, 200))
         self.screen.blit(title, (self.SCREEN_WIDTH//2 - title.get_width()//2, 50))
         
-        user_text = self.font_small.render(f"Гравець: {username}", True, (255, 180, 180))
+        user_text = self._text(self.font_small, f"Гравець: {username}", (255, 180, 180))
         self.screen.blit(user_text, (self.SCREEN_WIDTH//2 - user_text.get_width()//2, 130))
         
         # Використання UIConfig для кнопок меню
@@ -68,7 +146,7 @@ class GameRenderer:
         # Відмальовування меню вибору рівнів
         self.screen.fill((40, 20, 20))
         
-        title = self.font_big.render("ВИБІР РІВНЯ", True, (255, 200, 200))
+        title = self._text(self.font_big, "ВИБІР РІВНЯ", (255, 200, 200))
         self.screen.blit(title, (self.SCREEN_WIDTH//2 - title.get_width()//2, 60))
 
         for i in range(levels_count):
@@ -89,7 +167,7 @@ class GameRenderer:
         pygame.draw.rect(self.screen, (140, 50, 50), back_rect, border_radius=5)
         self._draw_text_centered("Назад", back_rect, self.font)
         
-        title = self.font_big.render(f"Рівень {level_index + 1}", True, (255, 200, 200))
+        title = self._text(self.font_big, f"Рівень {level_index + 1}", (255, 200, 200))
         self.screen.blit(title, (self.SCREEN_WIDTH // 2 - title.get_width() // 2, 20))
         
         # Логіка масштабування карти для прев'ю
@@ -106,30 +184,74 @@ class GameRenderer:
         offset_y = 100
         
         # Малювання мініатюрної карти
-        for y, row in enumerate(game_logic.level):
-            for x, tile in enumerate(row):
-                px, py = offset_x + x * tile_preview_size, offset_y + y * tile_preview_size
-                if tile_preview_size > 0:
-                    floor_scaled = pygame.transform.scale(self.floor_img, (tile_preview_size, tile_preview_size))
-                    self.screen.blit(floor_scaled, (px, py))
+        if tile_preview_size > 0:
+            size = (tile_preview_size, tile_preview_size)
+            floor_scaled = self._scaled(self.floor_img, size)
+            goal_scaled = self._scaled(self.goal_img, size)
+            wall_scaled = self._scaled(self.wall_img, size)
+            box_scaled = self._scaled(self.box_img, size)
+            player_scaled = self._scaled(self.player_sprites[game_logic.current_direction], size)
+            # Усі клітинки малюються одним викликом Surface.blits
+            blits = []
+            for y, row in enumerate(game_logic.level):
+                for x, tile in enumerate(row):
+                    px, py = offset_x + x * tile_preview_size, offset_y + y * tile_preview_size
+                    blits.append((floor_scaled, (px, py)))
                     if (x, y) in game_logic.goals:
-                        goal_scaled = pygame.transform.scale(self.goal_img, (tile_preview_size, tile_preview_size))
-                        self.screen.blit(goal_scaled, (px, py))
+                        blits.append((goal_scaled, (px, py)))
                     if tile == "#":
-                        wall_scaled = pygame.transform.scale(self.wall_img, (tile_preview_size, tile_preview_size))
-                        self.screen.blit(wall_scaled, (px, py))
+                        blits.append((wall_scaled, (px, py)))
                     elif tile == "$":
-                        box_scaled = pygame.transform.scale(self.box_img, (tile_preview_size, tile_preview_size))
-                        self.screen.blit(box_scaled, (px, py))
+                        blits.append((box_scaled, (px, py)))
                     elif tile == "@":
-                        player_scaled = pygame.transform.scale(self.player_sprites[game_logic.current_direction], (tile_preview_size, tile_preview_size))
-                        self.screen.blit(player_scaled, (px, py))
+                        blits.append((player_scaled, (px, py)))
+            self.screen.blits(blits, doreturn=False)
         
         # Кнопка Почати
         start_rect = pygame.Rect(*UIConfig.PREVIEW_START)
         pygame.draw.rect(self.screen, (160, 50, 50), start_rect, border_radius=10)
         self._draw_text_centered("Почати", start_rect, self.font)
 
+    def _static_chunk(self, board, cx, cy):
+        # Фрагмент статичного шару (cx, cy); будується при першій появі в кадрі
+        chunk = self._static_chunks.get((cx, cy))
+        if chunk is None:
+            tiles, tile = STATIC_CHUNK_TILES, self.TILE_SIZE
+            x0, y0 = cx * tiles, cy * tiles
+            x1, y1 = min(x0 + tiles, board.width), min(y0 + tiles, board.height)
+            chunk = pygame.Surface(((x1 - x0) * tile, (y1 - y0) * tile)).convert()
+            chunk.fill((35, 20, 20))
+            floor, goal, wall = self.floor_img, self.goal_img, self.wall_img
+            cells, width, blits = board.cells, board.width, []
+            for y in range(y0, y1):
+                for x in range(x0, min(x1, board.row_lengths[y])):
+                    pos = ((x - x0) * tile, (y - y0) * tile)
+                    cell = cells[y * width + x]
+                    blits.append((floor, pos))
+                    if cell & GOAL: blits.append((goal, pos))
+                    if cell & WALL: blits.append((wall, pos))
+            chunk.blits(blits, doreturn=False)
+            self._static_chunks.put((cx, cy), chunk)
+        return chunk
+
+    def _draw_static_layer(self, game_logic, cam_x, cam_y):
+        # Статичний шар: малюються лише фрагменти, що перетинають поле зору камери.
+        # Фрагменти скидаються при зміні рівня
+        key = (id(game_logic), game_logic.level_version)
+        if self._static_key != key:
+            self._static_chunks.clear()
+            self._static_key = key
+        board, span = game_logic.board, STATIC_CHUNK_TILES * self.TILE_SIZE
+        view = pygame.Rect(cam_x, cam_y, self.SCREEN_WIDTH, self.SCREEN_HEIGHT)
+        visible = view.clip(pygame.Rect(0, 0, board.width * self.TILE_SIZE, board.height * self.TILE_SIZE))
+        if not (visible.width and visible.height):
+            return
+        blits = []
+        for cy in range(visible.top // span, (visible.bottom - 1) // span + 1):
+            for cx in range(visible.left // span, (visible.right - 1) // span + 1):
+                blits.append((self._static_chunk(board, cx, cy), (cx * span - cam_x, cy * span - cam_y)))
+        self.screen.blits(blits, doreturn=False)
+
     def draw_game(self, game_logic, level_index, show_stats=False, global_stats=None):
         # Основний рендер гри з камерою
         self.screen.fill((35, 20, 20))
@@ -137,18 +259,20 @@ class GameRenderer:
         cam_x = game_logic.player_x * self.TILE_SIZE - self.SCREEN_WIDTH // 2 + self.TILE_SIZE // 2
         cam_y = game_logic.player_y * self.TILE_SIZE - self.SCREEN_HEIGHT // 2 + self.TILE_SIZE // 2
 
-        for y, row in enumerate(game_logic.level):
-            for x, tile in enumerate(row):
-                draw_x, draw_y = x * self.TILE_SIZE - cam_x, y * self.TILE_SIZE - cam_y
-                if -self.TILE_SIZE < draw_x < self.SCREEN_WIDTH and -self.TILE_SIZE < draw_y < self.SCREEN_HEIGHT:
-                    self.screen.blit(self.floor_img, (draw_x, draw_y))
-                    if (x, y) in game_logic.goals: self.screen.blit(self.goal_img, (draw_x, draw_y))
-                    if tile == "#": self.screen.blit(self.wall_img, (draw_x, draw_y))
-                    elif tile == "$": self.screen.blit(self.box_img, (draw_x, draw_y))
-                    elif tile == "@": self.screen.blit(self.player_sprites[game_logic.current_direction], (draw_x, draw_y))
+        self._draw_static_layer(game_logic, cam_x, cam_y)
+
+        # Динамічні спрайти: ящики та гравець
+        box_img, blits = self.box_img, []
+        for box in game_logic.boxes:
+            draw_x, draw_y = box.x * self.TILE_SIZE - cam_x, box.y * self.TILE_SIZE - cam_y
+            if -self.TILE_SIZE < draw_x < self.SCREEN_WIDTH and -self.TILE_SIZE < draw_y < self.SCREEN_HEIGHT:
+                blits.append((box_img, (draw_x, draw_y)))
+        blits.append((self.player_sprites[game_logic.current_direction],
+                      (game_logic.player_x * self.TILE_SIZE - cam_x, game_logic.player_y * self.TILE_SIZE - cam_y)))
+        self.screen.blits(blits, doreturn=False)
 
         pygame.draw.rect(self.screen, (80, 40, 40), (10, 10, 310, 40), border_radius=6)
-        info = self.font.render(f"Рівень {level_index + 1} | Кроків: {game_logic.steps_count}", True, (255, 220, 220))
+        info = self._text(self.font, f"Рівень {level_index + 1} | Кроків: {game_logic.steps_count}", (255, 220, 220))
         self.screen.blit(info, (15, 10 + (40 - info.get_height()) // 2))
         
         self.draw_control_buttons(game_logic)
@@ -171,16 +295,41 @@ class GameRenderer:
             pygame.draw.rect(self.screen, color, rect, border_radius=5)
             self._draw_text_centered(txt, rect, self.font_small)
 
+    def forget_overlays(self):
+        # Початок повного кадру: збережені копії під оверлеями застаріли
+        self._under.clear()
+
+    def _save_under(self, name, rect):
+        rect = rect.clip(self.screen.get_rect())
+        self._under[name] = (self.screen.subsurface(rect).copy(), rect)
+
+    def _restore_under(self, name):
+        # Повертає на екран сцену під оверлеєм name; None, якщо його не малювали
+        under = self._under.get(name)
+        if under is None:
+            return None
+        surf, rect = under
+        self.screen.blit(surf, rect)
+        return rect
+
     def draw_status_msg(self, message):
         """Метод для малювання повідомлень про збереження"""
-        msg_surf = self.font_small.render(message, True, (100, 255, 100))
-        self.screen.blit(msg_surf, (self.SCREEN_WIDTH // 2 - msg_surf.get_width() // 2, 100))
+        msg_surf = self._text(self.font_small, message, (100, 255, 100))
+        rect = msg_surf.get_rect(topleft=(self.SCREEN_WIDTH // 2 - msg_surf.get_width() // 2, 100))
+        self._save_under("message", rect)
+        return self.screen.blit(msg_surf, rect)
+
+    def clear_status_msg(self):
+        # Стирає повідомлення; повертає змінену область або None
+        rect = self._restore_under("message")
+        self._under.pop("message", None)
+        return rect
 
     def draw_key_hints(self):
         hints = ["M - Карта", "I - Статистика", "F5 - Зберегти", "F9 - Завантажити"]
         y_start = self.SCREEN_HEIGHT - 120
         for i, hint in enumerate(hints):
-            text = self.font_mini.render(hint, True, (255, 180, 180))
+            text = self._text(self.font_mini, hint, (255, 180, 180))
             self.screen.blit(text, (10, y_start + i * 20))
 
     def draw_statistics_overlay(self, game_logic, global_stats):
@@ -193,73 +342,130 @@ class GameRenderer:
         surf.fill((50, 25, 25))
         self.screen.blit(surf, (overlay_x, overlay_y))
 
-        title = self.font.render("СТАТИСТИКА", True, (255, 200, 100))
+        title = self._text(self.font, "СТАТИСТИКА", (255, 200, 100))
         self.screen.blit(title, (self.SCREEN_WIDTH//2 - title.get_width()//2, overlay_y + 8))
         
-        boxes_on_goals = sum(1 for y, row in enumerate(game_logic.level) for x, t in enumerate(row) 
-                             if (t == "$" and (x, y) in game_logic.goals) or t == "*")
-        
-        lines = [f"Кроків: {game_logic.steps_count}", f"Ящиків на місці: {boxes_on_goals}"]
+        lines = [f"Кроків: {game_logic.steps_count}", f"Ящиків на місці: {game_logic.boxes_on_goals}"]
         for i, line in enumerate(lines):
-            text = self.font_tiny.render(line, True, (255, 230, 230))
+            text = self._text(self.font_tiny, line, (255, 230, 230))
             self.screen.blit(text, (overlay_x + 16, overlay_y + 44 + i * 30))
 
+    def draw_profiler_overlay(self, summary, state, refresh=False):
+        # Оверлей профайлера кадрів: час кадру поточного стану та фаз, мс.
+        # refresh — оновлення поверх попереднього кадру; None, якщо новий оверлей
+        # більший за старий і потрібен повний кадр
+        frame = summary["states"].get(state)
+        lines = [f"Кадрів: {summary['frames']}"]
+        if summary.get("first_frame_ms") is not None:
+            lines[0] += f" | перший: {summary['first_frame_ms']:.0f} мс"
+        if frame:
+            lines.append(f"{state}: p50 {frame['p50_ms']:.1f} p95 {frame['p95_ms']:.1f} p99 {frame['p99_ms']:.1f}")
+        work = summary["work"]
+        lines.append(f"робота: p50 {work['p50_ms']:.2f} p95 {work['p95_ms']:.2f} max {work['max_ms']:.1f}")
+        for name, phase in summary["phases"].items():
+            lines.append(f"{name}: {phase['mean_ms']:.2f} / p95 {phase['p95_ms']:.2f}")
+
+        overlay_w, overlay_h = 280, 10 + len(lines) * 18
+        overlay_x, overlay_y = self.SCREEN_WIDTH - overlay_w - 5, self.SCREEN_HEIGHT - overlay_h - 5
+        rect = pygame.Rect(overlay_x, overlay_y, overlay_w, overlay_h)
+        if refresh:
+            under = self._under.get("profiler")
+            if under is None or not under[1].contains(rect):
+                return None
+            rect = self._restore_under("profiler")
+        else:
+            self._save_under("profiler", rect)
+        surf = pygame.Surface((overlay_w, overlay_h))
+        surf.set_alpha(200)
+        surf.fill((20, 20, 30))
+        self.screen.blit(surf, (overlay_x, overlay_y))
+        for i, line in enumerate(lines):
+            text = self.font_mini.render(line, True, (200, 230, 255))
+            self.screen.blit(text, (overlay_x + 8, overlay_y + 5 + i * 18))
+        return rect
+
     def draw_full_map(self, game_logic, level_index):
         # Повноекранна карта рівня
         self.screen.fill((25, 15, 20))
-        title = self.font_big.render(f"КАРТА РІВНЯ {level_index + 1}", True, (255, 200, 200))
+        title = self._text(self.font_big, f"КАРТА РІВНЯ {level_index + 1}", (255, 200, 200))
         self.screen.blit(title, (self.SCREEN_WIDTH // 2 - title.get_width() // 2, 20))
 
-    def draw_minimap(self, game_logic):
-        # Відмальовування міні-карти
-        map_h = len(game_logic.level)
-        map_w = max(len(row) for row in game_logic.level) if game_logic.level else 0
+    def _minimap_cell_color(self, game_logic, x, y):
+        # Колір клітинки міні-карти (None — підлога без кольору)
+        tile = game_logic.level[y][x]
+        if tile == "#": return (80, 80, 85)
+        if tile == "$": return (50, 200, 50) if (x, y) in game_logic.goals else (139, 90, 43)
+        if tile == "@": return (255, 220, 50)
+        if (x, y) in game_logic.goals: return (80, 120, 200)
+        return None
+
+    def _paint_minimap_cell(self, game_logic, x, y):
+        size = self._minimap_cell_size
+        rect = (5 + x * size, 5 + y * size, size, size)
+        color = self._minimap_cell_color(game_logic, x, y)
+        self._minimap.fill(color or (50, 50, 55), rect)
+
+    def _build_minimap(self, game_logic):
+        # Повна побудова поверхні міні-карти (раз на рівень)
+        map_h, map_w = game_logic.board.height, game_logic.board.width
         scale = min(150 / (map_w * self.TILE_SIZE), 150 / (map_h * self.TILE_SIZE), 1.0)
         size = max(int(self.TILE_SIZE * scale), 2)
         
-        mx, my = self.SCREEN_WIDTH - (map_w * size) - 10, 10
-        pygame.draw.rect(self.screen, (50, 50, 55), (mx-5, my-5, map_w*size+10, map_h*size+10), border_radius=5)
-        
+        surf = pygame.Surface((map_w * size + 10, map_h * size + 10), pygame.SRCALPHA)
+        pygame.draw.rect(surf, (50, 50, 55), surf.get_rect(), border_radius=5)
+        self._minimap, self._minimap_cell_size = surf, size
         for y, row in enumerate(game_logic.level):
-            for x, tile in enumerate(row):
-                px, py = mx + x * size, my + y * size
-                if tile == "#": color = (80, 80, 85)
-                elif tile == "$": color = (50, 200, 50) if (x, y) in game_logic.goals else (139, 90, 43)
-                elif tile == "@": color = (255, 220, 50)
-                elif (x, y) in game_logic.goals: color = (80, 120, 200)
-                else: continue
-                pygame.draw.rect(self.screen, color, (px, py, size, size))
+            for x in range(len(row)):
+                if self._minimap_cell_color(game_logic, x, y):
+                    self._paint_minimap_cell(game_logic, x, y)
+
+    def draw_minimap(self, game_logic):
+        # Відмальовування міні-карти: поверхня будується раз на рівень,
+        # далі перемальовуються лише клітинки, змінені ходами
+        key = (id(game_logic), game_logic.level_version)
+        changed = game_logic.take_changed_cells()
+        if self._minimap is None or self._minimap_key != key or changed is None:
+            self._build_minimap(game_logic)
+            self._minimap_key = key
+        else:
+            for x, y in changed:
+                self._paint_minimap_cell(game_logic, x, y)
+        
+        self.screen.blit(self._minimap, (self.SCREEN_WIDTH - self._minimap.get_width() - 5, 5))
 
     def draw_leaderboard(self, levels_count):
         # Таблиця лідерів
         self.screen.fill((35, 20, 25))
-        title = self.font_big.render("ТАБЛИЦЯ ЛІДЕРІВ", True, (255, 200, 200))
+        title = self._text(self.font_big, "ТАБЛИЦЯ ЛІДЕРІВ", (255, 200, 200))
         self.screen.blit(title, (self.SCREEN_WIDTH//2 - title.get_width()//2, 40))
 
         for level_num in range(1, levels_count + 1):
             col, row = (level_num - 1) // 3, (level_num - 1) % 3
             x_pos, current_y = 60 + col * 350, 130 + row * 135
             
-            level_title = self.font.render(f"Рівень {level_num}:", True, (255, 180, 120))
+            level_title = self._text(self.font, f"Рівень {level_num}:", (255, 180, 120))
             self.screen.blit(level_title, (x_pos, current_y))
             
-            leaderboard = get_leaderboard(level_num)
+            leaderboard = leaderboard_service.get(level_num)
             if leaderboard:
                 for idx, (username, steps) in enumerate(leaderboard[:3], 1):
-                    entry = self.font_tiny.render(f"{idx}. {username} - {steps} кр.", True, (255, 230, 230))
+                    entry = self._text(self.font_tiny, f"{idx}. {username} - {steps} кр.", (255, 230, 230))
                     self.screen.blit(entry, (x_pos + 20, current_y + 35 + (idx-1)*22))
             else:
-                no_data = self.font_tiny.render("Немає даних", True, (160, 100, 100))
+                no_data = self._text(self.font_tiny, "Немає даних", (160, 100, 100))
                 self.screen.blit(no_data, (x_pos + 20, current_y + 35))
         
         back_rect = pygame.Rect(*UIConfig.BACK_BTN)
         pygame.draw.rect(self.screen, (140, 50, 50), back_rect, border_radius=5)
         self._draw_text_centered("Назад", back_rect, self.font)
 
-    def draw_win_screen(self, level_index, levels_count, steps, has_user):
+    def draw_win_screen(self, level_index, levels_count, steps, has_user, save_status=None):
         self.screen.fill((25, 15, 15))
-        win_t = self.font_big.render("РІВЕНЬ ПРОЙДЕНО!", True, (255, 100, 100))
+        win_t = self._text(self.font_big, "РІВЕНЬ ПРОЙДЕНО!", (255, 100, 100))
         self.screen.blit(win_t, (self.SCREEN_WIDTH // 2 - win_t.get_width() // 2, 150))
+
+        if has_user:
+            self.draw_win_status(save_status)
         
         btn_next_rect = pygame.Rect(*UIConfig.WIN_NEXT)
         pygame.draw.rect(self.screen, (180, 60, 60), btn_next_rect, border_radius=10)
@@ -268,4 +474,20 @@ class GameRenderer:
         
         btn_menu_rect = pygame.Rect(*UIConfig.WIN_MENU)
         pygame.draw.rect(self.screen, (160, 70, 70), btn_menu_rect, border_radius=10)
-        self._draw_text_centered("В меню", btn_menu_rect, self.font)
\ No newline at end of file
+        self._draw_text_centered("В меню", btn_menu_rect, self.font)
+
+    def draw_win_status(self, save_status, refresh=False):
+        # Стан фонового запису результату в таблицю лідерів на екрані перемоги (смуга
+        # на всю ширину). refresh — заміна попереднього тексту поверх сцени під ним
+        height = max(self.font.size(text)[1] for text, _ in SAVE_STATUS_TEXT.values())
+        rect = pygame.Rect(0, 215, self.SCREEN_WIDTH, height)
+        if refresh:
+            if self._restore_under("win_status") is None:
+                return None
+        else:
+            self._save_under("win_status", rect)
+        if save_status in SAVE_STATUS_TEXT:
+            text, color = SAVE_STATUS_TEXT[save_status]
+            status_t = self._text(self.font, text, color)
+            self.screen.blit(status_t, (self.SCREEN_WIDTH // 2 - status_t.get_width() // 2, 215))
+        return rect
\ No newline at end of file
@@ -0,0 +1,193 @@
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from functools import wraps
+from game_logic import GameLogic
+
+# Методи GameLogic, що вимірюються, і назви їх операцій.
+# move_player рахується як "push", якщо хід посунув ящик, інакше як "move".
+OPERATIONS = {
+    "move_player": "move",
+    "undo": "undo",
+    "redo": "redo",
+    "reset_level": "reset",
+    "save_state_to_binary": "save",
+    "load_state_from_binary": "load",
+}
+OPERATION_NAMES = ("move", "push", "undo", "redo", "reset", "save", "load")
+
+# Кількість кошиків гістограми: кошик b — тривалість від 2**(b-1) до 2**b наносекунд
+BUCKETS = 40
+
+
+class OperationStats:
+    # Лічильник і гістограма тривалості однієї операції (кошики за log2)
+    __slots__ = ("count", "total_ns", "max_ns", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.buckets = [0] * BUCKETS
+
+    def add(self, elapsed_ns):
+        self.count += 1
+        self.total_ns += elapsed_ns
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+        self.buckets[min(elapsed_ns.bit_length(), BUCKETS - 1)] += 1
+
+    def percentile(self, fraction):
+        # Верхня межа кошика, в який потрапляє заданий перцентиль, нс
+        if not self.count:
+            return 0
+        rank, seen = fraction * self.count, 0
+        for bucket, amount in enumerate(self.buckets):
+            seen += amount
+            if seen >= rank:
+                return min(1 << bucket, self.max_ns)
+        return self.max_ns
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": self.total_ns / 1e6,
+            "mean_us": self.total_ns / self.count / 1e3 if self.count else 0.0,
+            "p50_us": self.percentile(0.5) / 1e3,
+            "p90_us": self.percentile(0.9) / 1e3,
+            "p99_us": self.percentile(0.99) / 1e3,
+            "max_us": self.max_ns / 1e3,
+            # ненульові кошики: верхня межа в нс -> кількість викликів
+            "histogram": {str(1 << bucket): amount for bucket, amount in enumerate(self.buckets) if amount},
+        }
+
+
+class Instrumentation:
+    # Вимірювання операцій GameLogic. Поки вимкнено, методи класу не змінені
+    # і нічого не коштують; enable() підміняє їх обгортками, disable() повертає.
+
+    def __init__(self):
+        self.stats = {name: OperationStats() for name in OPERATION_NAMES}
+        self._originals = {}
+        self._started = time.time()
+
+    @property
+    def enabled(self):
+        return bool(self._originals)
+
+    def enable(self):
+        if self.enabled:
+            return self
+        for method_name, operation in OPERATIONS.items():
+            method = getattr(GameLogic, method_name)
+            self._originals[method_name] = method
+            setattr(GameLogic, method_name, self._wrap(method, operation))
+        return self
+
+    def disable(self):
+        for method_name, method in self._originals.items():
+            setattr(GameLogic, method_name, method)
+        self._originals.clear()
+
+    def reset(self):
+        self.stats = {name: OperationStats() for name in OPERATION_NAMES}
+        self._started = time.time()
+
+    def _wrap(self, method, operation):
+        clock = time.perf_counter_ns
+        if operation == "move":
+            @wraps(method)
+            def measured_move(game, *args, **kwargs):
+                index = game.history_index
+                started = clock()
+                result = method(game, *args, **kwargs)
+                elapsed = clock() - started
+                pushed = game.history_index != index and game.history[game.history_index][4] is not None
+                self.stats["push" if pushed else "move"].add(elapsed)
+                return result
+            return measured_move
+
+        @wraps(method)
+        def measured(game, *args, **kwargs):
+            started = clock()
+            try:
+                return method(game, *args, **kwargs)
+            finally:
+                self.stats[operation].add(clock() - started)
+        return measured
+
+    def snapshot(self):
+        # Поточні лічильники як словник (для JSON)
+        return {
+            "started": self._started,
+            "time": time.time(),
+            "operations": {name: stats.to_dict() for name, stats in self.stats.items()},
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.snapshot(), ensure_ascii=False, **kwargs)
+
+    def export(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json(indent=2))
+
+
+class StackSampler:
+    # Вибірка стеків викликів потоку на вимогу (за замовчуванням — головного).
+    # Окремий потік раз на interval секунд читає sys._current_frames();
+    # результат — кількість спостережень кожного стеку у "згорнутому" вигляді
+    # (файл:функція;... — формат для flame graph).
+
+    def __init__(self, interval=0.005, thread_id=None):
+        self.interval = interval
+        self.thread_id = thread_id if thread_id is not None else threading.main_thread().ident
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        return self.samples
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def folded(self):
+        # Текст у форматі "стек кількість" по рядку на стек
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+    def export(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.folded())
+
+
+def sample_stacks(duration, interval=0.005, thread_id=None):
+    # Вибірка стеків іншого потоку протягом duration секунд
+    sampler = StackSampler(interval, thread_id).start()
+    time.sleep(duration)
+    return sampler.stop()
+
+
+# Спільний екземпляр для гри та інструментів
+instrumentation = Instrumentation()
@@ -0,0 +1,190 @@
+import glob
+import os
+import struct
+import time
+import savefile
+from game_entities import AdvancedPlayer
+from simulator import HeadlessEngine
+
+# Журнал ходів для автозбереження.
+# Кожна ігрова сесія пише свій файл: заголовок (сигнатура, версія, назва рівня,
+# знімок початку історії у форматі savefile), далі по байту на подію:
+#   0-7  — хід (код savefile: напрямок і біт поштовху)
+#   UNDO, REDO — відкат назад / вперед
+#   GOTO + 4 байти — перехід до стану історії з указаним номером
+# Записи буферизуються і скидаються на диск з fsync не рідше, ніж раз на SYNC_INTERVAL.
+HEADER = struct.Struct("<4sBHI")
+GOTO_INDEX = struct.Struct("<I")
+MAGIC = b"SKJR"
+VERSION = 1
+
+UNDO, REDO, GOTO = 8, 9, 10
+
+# Папка журналів і розширення файлів
+JOURNAL_DIR = "autosave"
+EXTENSION = ".journal"
+
+# Скільки байтів накопичувати в пам'яті та як часто робити fsync, секунд
+BUFFER_SIZE = 256
+SYNC_INTERVAL = 1.0
+
+
+class Journal:
+    # Журнал поточної сесії; GameLogic викликає record_* після кожної зміни стану
+
+    def __init__(self, path):
+        self.path = path
+        self._fd = None
+        self._buffer = bytearray()
+        self._last_sync = time.monotonic()
+
+    # Новий журнал з унікальною назвою в папці directory.
+    @classmethod
+    def new_session(cls, directory=JOURNAL_DIR):
+        os.makedirs(directory, exist_ok=True)
+        name = time.strftime("%Y%m%d-%H%M%S") + f"-{os.getpid()}" + EXTENSION
+        return cls(os.path.join(directory, name))
+
+    def start(self, game_logic):
+        # Початок журналу з поточної історії GameLogic (після скидання або завантаження рівня)
+        self.close()
+        level = (game_logic.level_filename or "").encode("utf-8")
+        start = savefile.pack_start(game_logic.history[0], game_logic.goals)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        self._buffer = bytearray(HEADER.pack(MAGIC, VERSION, len(level), len(start)) + level + start)
+        self._buffer += savefile.encode_moves(game_logic.history[1:])
+        if game_logic.history_index != len(game_logic.history) - 1:
+            self.record_goto(game_logic.history_index)
+        self.flush(sync=True)
+
+    def record_move(self, delta):
+        (px, py), (nx, ny), _, _, box_to = delta
+        code = savefile.VECTORS.index((nx - px, ny - py))
+        self._record(code | savefile.PUSH if box_to is not None else code)
+
+    def record_undo(self):
+        self._record(UNDO)
+
+    def record_redo(self):
+        self._record(REDO)
+
+    def record_goto(self, index):
+        self._buffer.append(GOTO)
+        self._buffer += GOTO_INDEX.pack(index)
+
+    def _record(self, code):
+        self._buffer.append(code)
+        if len(self._buffer) >= BUFFER_SIZE:
+            self.flush()
+
+    def poll(self):
+        # Періодичне скидання буфера (викликається з головного циклу)
+        if self._buffer and time.monotonic() - self._last_sync >= SYNC_INTERVAL:
+            self.flush(sync=True)
+
+    def flush(self, sync=False):
+        if self._fd is None:
+            return
+        if self._buffer:
+            os.write(self._fd, self._buffer)
+            self._buffer.clear()
+        if sync or time.monotonic() - self._last_sync >= SYNC_INTERVAL:
+            os.fsync(self._fd)
+            self._last_sync = time.monotonic()
+
+    def close(self, remove=False):
+        # Закриття журналу; remove=True — штатне завершення, відновлювати нічого
+        if self._fd is not None:
+            self.flush(sync=True)
+            os.close(self._fd)
+            self._fd = None
+        if remove and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def find_sessions(directory=JOURNAL_DIR):
+    # Журнали попередніх сесій, від найновішого
+    return sorted(glob.glob(os.path.join(directory, "*" + EXTENSION)), key=os.path.getmtime, reverse=True)
+
+
+def read(path):
+    # Розбір журналу: історія ходів з урахуванням undo/redo; None, якщо файл пошкоджений
+    with open(path, "rb") as f:
+        data = f.read()
+    if len(data) < HEADER.size:
+        return None
+    magic, version, level_length, start_length = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        return None
+    offset = HEADER.size + level_length
+    if offset + start_length > len(data):
+        return None
+    level = data[HEADER.size:offset].decode("utf-8")
+    start = savefile.unpack_start(data, offset, offset + start_length)
+    offset += start_length
+
+    # moves — ходи історії, index — поточна позиція в ній
+    moves, index = bytearray(), 0
+    positions = [start["player_pos"]]
+    visited = {start["player_pos"]}
+    made = 0
+    while offset < len(data):
+        code = data[offset]
+        offset += 1
+        if code < UNDO:
+            del moves[index:]
+            del positions[index + 1:]
+            dx, dy = savefile.VECTORS[code & 3]
+            x, y = positions[index]
+            moves.append(code)
+            positions.append((x + dx, y + dy))
+            visited.add((x + dx, y + dy))
+            index += 1
+            made += 1
+        elif code == UNDO:
+            index = max(index - 1, 0)
+        elif code == REDO:
+            index = min(index + 1, len(moves))
+        elif code == GOTO:
+            if offset + GOTO_INDEX.size > len(data):
+                break  # обірваний останній запис
+            index = min(GOTO_INDEX.unpack_from(data, offset)[0], len(moves))
+            offset += GOTO_INDEX.size
+        else:
+            return None
+    return {"level": level, "start": start, "moves": bytes(moves), "index": index,
+            "visited": visited, "moves_made": made}
+
+
+def replay(entry, index=None):
+    # Програвання ходів журналу (до поточної позиції або до index) безголовим рушієм
+    start = entry["start"]
+    moves = entry["moves"][:entry["index"] if index is None else index]
+    engine = HeadlessEngine(start["board"], start["player_pos"])
+    return engine.run(savefile.to_lurd(moves))
+
+
+def restore(game_logic, path):
+    # Відновлення гри з журналу. Безголовий рушій перевіряє, що всі ходи
+    # (разом з тими, що доступні через redo) можливі на цьому полі;
+    # після цього історія для undo/redo відтворюється в GameLogic.
+    try:
+        entry = read(path)
+    except (OSError, ValueError, IndexError, UnicodeDecodeError, struct.error):
+        return False
+    # Сесія без жодного ходу (наприклад, збій у меню) — відновлювати нічого
+    if entry is None or not entry["moves"]:
+        return False
+    moves = entry["moves"]
+    if not savefile.check_moves(entry["start"], moves):
+        return False
+
+    game_logic.restore_history(entry["start"], moves, entry["index"])
+    game_logic.level_filename = entry["level"] or None
+    game_logic.visited_positions = entry["visited"]
+    game_logic.player_obj = AdvancedPlayer(game_logic.player_x, game_logic.player_y, "Герой")
+    game_logic.player_obj += 10 * entry["moves_made"]
+    game_logic.player_obj.direction = game_logic.current_direction
+    if game_logic.journal:
+        game_logic.journal.start(game_logic)
+    return True
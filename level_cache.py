@@ -0,0 +1,108 @@
+import hashlib
+import os
+import struct
+from board import Board, TILE_FLAGS, VOID
+from lru import LRUCache
+
+# Заголовок скомпільованого рівня:
+# сигнатура, версія, mtime_ns і розмір джерела, хеш вмісту, ширина, висота
+HEADER = struct.Struct("<4sBqQ8sHH")
+MAGIC = b"SKLV"
+VERSION = 1
+
+
+def parse_level(data):
+    # Розбір тексту рівня одразу в Board
+    rows = data.decode("utf-8").split("\n")
+    if rows and rows[-1] == "":
+        rows.pop()
+    rows = [row.rstrip("\r") for row in rows]
+    height = len(rows)
+    width = max((len(row) for row in rows), default=0)
+    cells = bytearray([VOID]) * (width * height)
+    for y, row in enumerate(rows):
+        cells[y * width:y * width + len(row)] = bytes(TILE_FLAGS.get(ch, 0) for ch in row)
+    return Board(width, height, tuple(len(row) for row in rows), cells)
+
+
+class LevelCache:
+    # Кеш розібраних рівнів: у пам'яті (LRU) та на диску у двійковому вигляді.
+    # Запис вважається актуальним, поки збігаються mtime і розмір файлу;
+    # якщо вони змінились, а вміст (хеш) той самий — скомпільована версія лишається.
+
+    def __init__(self, levels_dir="levels", cache_dir=None, max_entries=16):
+        self.levels_dir = levels_dir
+        self.cache_dir = cache_dir or os.path.join(levels_dir, ".compiled")
+        self.max_entries = max_entries
+        self._entries = LRUCache(max_entries)
+
+    def load(self, filename):
+        # Копія поля рівня або None, якщо файлу немає
+        path = os.path.join(self.levels_dir, filename)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        stamp = (stat.st_mtime_ns, stat.st_size)
+
+        entry = self._entries.get(filename)
+        if entry is None or entry[0] != stamp:
+            entry = self._entries.put(filename, (stamp, self._load_compiled(filename, path, stamp)))
+        return entry[1].copy()
+
+    def clear(self):
+        self._entries.clear()
+
+    def _compiled_path(self, filename):
+        return os.path.join(self.cache_dir, filename + ".bin")
+
+    def _load_compiled(self, filename, path, stamp):
+        # Скомпільована версія з диска або розбір джерела з перезаписом кешу
+        compiled = self._compiled_path(filename)
+        header, board = self._read_compiled(compiled)
+        if header and (header[2], header[3]) == stamp:
+            return board
+
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.blake2b(data, digest_size=8).digest()
+        if not (header and header[4] == digest):
+            board = parse_level(data)
+        self._write_compiled(compiled, stamp, digest, board)
+        return board
+
+    def _read_compiled(self, compiled):
+        # Заголовок і поле зі скомпільованого файлу; (None, None), якщо файлу немає
+        # або він пошкоджений (обірваний, чужий) — тоді рівень розбирається заново
+        try:
+            with open(compiled, "rb") as f:
+                data = f.read()
+            header = HEADER.unpack_from(data)
+            magic, version, _, _, _, width, height = header
+            if magic != MAGIC or version != VERSION:
+                return None, None
+            offset = HEADER.size
+            row_lengths = struct.unpack_from(f"<{height}H", data, offset)
+            offset += 2 * height
+            if len(data) != offset + width * height or any(length > width for length in row_lengths):
+                return None, None
+            return header, Board(width, height, row_lengths, bytearray(data[offset:]))
+        except (OSError, struct.error):
+            return None, None
+
+    def _write_compiled(self, compiled, stamp, digest, board):
+        # Атомарний запис; помилки (наприклад, папка лише для читання) ігноруються
+        try:
+            os.makedirs(os.path.dirname(compiled), exist_ok=True)
+            tmp = compiled + ".tmp"
+            with open(tmp, "wb") as f:
+                f.write(HEADER.pack(MAGIC, VERSION, stamp[0], stamp[1], digest, board.width, board.height))
+                f.write(struct.pack(f"<{board.height}H", *board.row_lengths))
+                f.write(board.cells)
+            os.replace(tmp, compiled)
+        except OSError:
+            pass
+
+
+# Спільний кеш рівнів гри
+level_cache = LevelCache()
@@ -0,0 +1,129 @@
+from array import array
+from collections import deque
+from board import WALL, GOAL, VOID
+from lru import LRUCache
+
+BLOCKED = WALL | VOID
+
+# "Нескінченна" відстань для недосяжних цілей
+UNREACHABLE = 1 << 20
+
+# Скільки різних планувань рівнів тримати в кеші
+CACHE_SIZE = 32
+
+_cache = LRUCache(CACHE_SIZE)
+
+
+class GoalDistances:
+    # Відстані у поштовхах до кожної цілі: послідовність масивів array("I"),
+    # по одному на ціль; масив цілі рахується при першому зверненні до нього
+
+    def __init__(self, tables):
+        self._tables = tables
+        self._maps = [None] * len(tables.goals)
+
+    def __len__(self):
+        return len(self._maps)
+
+    def __getitem__(self, k):
+        distances = self._maps[k]
+        if distances is None:
+            distances = self._maps[k] = self._tables.pull_distances((self._tables.goals[k],))
+        return distances
+
+    def __iter__(self):
+        return (self[k] for k in range(len(self._maps)))
+
+
+class LevelTables:
+    # Статичні таблиці рівня, що залежать лише від стін і цілей.
+    # Індекси — у просторі Board.padded(): (y + 1) * width + x + 1.
+    #   dead           — клітинки, з яких ящик не можна дотягнути до жодної цілі
+    #   goal_distances — для кожної цілі: відстань у поштовхах від кожної клітинки
+    #   nearest_goal   — відстань до найближчої цілі
+    #   tunnels        — 1, якщо клітинка між двома стінами (коридор шириною 1)
+    #   corners        — 1, якщо клітинка має стіни з двох сусідніх боків
+    # Відстані рахуються пошуком у ширину лише при першому зверненні (розв'язувач,
+    # підказки): nearest_goal і dead — одним пошуком від усіх цілей одразу,
+    # goal_distances — окремо для кожної цілі, яку запитали.
+
+    def __init__(self, board):
+        cells, width = board.padded()
+        self.width = width
+        self.size = len(cells)
+        self.directions = (-1, 1, -width, width)
+        self.walls = bytes(1 if cell & BLOCKED else 0 for cell in cells)
+        self.goals = [i for i, cell in enumerate(cells) if cell & GOAL]
+        self.goal_distances = GoalDistances(self)
+        self._nearest_goal = None
+        self._dead = None
+
+        walls = self.walls
+        tunnels, corners = bytearray(self.size), bytearray(self.size)
+        for i in range(width, self.size - width):
+            if walls[i]:
+                continue
+            left, right, up, down = walls[i - 1], walls[i + 1], walls[i - width], walls[i + width]
+            tunnels[i] = (left and right) or (up and down)
+            corners[i] = (left or right) and (up or down)
+        self.tunnels = bytes(tunnels)
+        self.corners = bytes(corners)
+
+    @property
+    def nearest_goal(self):
+        if self._nearest_goal is None:
+            self._nearest_goal = self.pull_distances(self.goals)
+        return self._nearest_goal
+
+    @property
+    def dead(self):
+        if self._dead is None:
+            nearest, walls = self.nearest_goal, self.walls
+            self._dead = bytes(1 if not walls[i] and nearest[i] >= UNREACHABLE else 0
+                               for i in range(self.size))
+        return self._dead
+
+    # Таблиці для поля board; однакові планування рахуються один раз.
+    @classmethod
+    def for_board(cls, board):
+        key = (board.width, bytes(cell & (BLOCKED | GOAL) for cell in board.cells))
+        tables = _cache.get(key)
+        if tables is None:
+            tables = _cache.put(key, cls(board))
+        return tables
+
+    def pull_distances(self, goals, walls=None):
+        # Зворотний пошук: ящик "тягнеться" від цілей, гравець стоїть за ним.
+        # Від кількох цілей одразу — відстань до найближчої з них.
+        # walls — інша таблиця заблокованих клітинок замість стін рівня
+        if walls is None:
+            walls = self.walls
+        distances = array("I", [UNREACHABLE]) * self.size
+        for goal in goals:
+            distances[goal] = 0
+        queue = deque(goals)
+        while queue:
+            cell = queue.popleft()
+            for d in self.directions:
+                prev, stand = cell - d, cell - 2 * d
+                if 0 <= stand < self.size and not walls[prev] and not walls[stand] \
+                        and distances[prev] == UNREACHABLE:
+                    distances[prev] = distances[cell] + 1
+                    queue.append(prev)
+        return distances
+
+    def index(self, x, y):
+        return (y + 1) * self.width + x + 1
+
+    def is_dead(self, x, y):
+        return bool(self.dead[self.index(x, y)])
+
+    def is_tunnel(self, x, y):
+        return bool(self.tunnels[self.index(x, y)])
+
+    def is_corner(self, x, y):
+        return bool(self.corners[self.index(x, y)])
+
+    # Відстань у поштовхах від (x, y) до найближчої цілі.
+    def goal_distance(self, x, y):
+        return self.nearest_goal[self.index(x, y)]
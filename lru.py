@@ -0,0 +1,34 @@
+from collections import OrderedDict
+
+
+class LRUCache:
+    # Словник з обмеженою кількістю записів: при переповненні витісняється
+    # найдавніше використаний. Ключі та значення задає той, хто кешує
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def get(self, key, default=None):
+        # Значення за ключем (запис стає найсвіжішим) або default
+        try:
+            self._entries.move_to_end(key)
+        except KeyError:
+            return default
+        return self._entries[key]
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return value
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
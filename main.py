@@ -1,10 +1,19 @@
+import time
+# Початок запуску для вимірювання часу до першого кадру
+STARTED = time.perf_counter()
+
+import os
 import pygame
 import sys
-from database import init_database, save_score
-from auth import LoginWindow
+from database import init_database
+from db_utils import close_connections
 from game_logic import GameLogic, get_global_statistics
 from game_render import GameRenderer
 from ui_config import UIConfig 
+from score_writer import ScoreWriter, PENDING
+import journal
+from frame_profiler import FrameProfiler
+from instrumentation import instrumentation, StackSampler
 
 class SokobanApp:
     def __init__(self):
@@ -14,7 +23,9 @@ class SokobanApp:
         self.screen = pygame.display.set_mode((self.SCREEN_WIDTH, self.SCREEN_HEIGHT))
         pygame.display.set_caption("Sokoban")
         
-        init_database()
+        # результати пишуться у фоновому потоці, щоб кадр не чекав на SQLite
+        self.score_writer = ScoreWriter().start()
+        self.score_ticket = None
         self.game_logic = GameLogic()
         self.renderer = GameRenderer(self.screen, self.TILE_SIZE)
         self.clock = pygame.time.Clock()
@@ -24,36 +35,191 @@ class SokobanApp:
         self.current_level_index = 0
         self.preview_origin = None
         
-        self.logged_in, self.user_id, self.username = LoginWindow().show_login()
-        if not self.logged_in:
-            self.user_id, self.username = None, "Гость"
+        # Вхід (tkinter і база даних) — після першого кадру, щоб вікно гри з'явилось одразу
+        self.logged_in, self.user_id, self.username = False, None, "Гость"
+        self.login_pending = True
+        # SOKOBAN_STARTUP_CHECK=1 — вивести час до першого кадру і завершити роботу
+        self.startup_check = bool(os.environ.get("SOKOBAN_STARTUP_CHECK"))
             
         self.show_statistics = False
         self.show_full_map = False
         self.save_message = ""
-        self.save_message_timer = 0
+        self.save_message_until = 0
+        # Повідомлення, показ якого чекає на вхід в екран гри
+        self.pending_message = ""
+        self.MESSAGE_MS = 3000
         self.move_hold = {"up": False, "down": False, "left": False, "right": False}
         self.last_move_tick = 0
         self.MOVE_REPEAT_MS = 200
+
+        # Кадр малюється лише після змін: dirty_regions — змінені області ("message",
+        # "win_status", "profiler"), що перемальовуються поверх попереднього кадру,
+        # None — увесь екран. Без змін цикл чекає на подію не довше IDLE_TIMEOUT_MS
+        self.dirty = True
+        self.dirty_regions = None
+        self.waited_events = []
+        self.IDLE_TIMEOUT_MS = 1000
+        self.drawn_save_status = None
         
         self.running = True
+        # Профайлер кадрів: F3 — оверлей, F4 — запис у файл
+        self.profiler = FrameProfiler()
+        self.show_profiler = False
+        # SOKOBAN_INSTRUMENT=<файл.json> — вимірювання операцій GameLogic із записом при виході
+        self.instrument_path = os.environ.get("SOKOBAN_INSTRUMENT")
+        if self.instrument_path:
+            instrumentation.enable()
+        # Вибірка стеків головного потоку: SOKOBAN_SAMPLE_STACKS=<файл> — від запуску
+        # до виходу, F6 — увімкнути/вимкнути під час гри; стеки записуються у
+        # "згорнутому" форматі при зупинці або виході
+        self.stack_sampler = None
+        self.stacks_path = os.environ.get("SOKOBAN_SAMPLE_STACKS")
+        if self.stacks_path:
+            self.stack_sampler = StackSampler().start()
+        # Журнал ходів поточної сесії; журнал попередньої (після збою) відновлюється
+        previous_sessions = journal.find_sessions()
+        self.game_logic.journal = journal.Journal.new_session()
         self.game_logic.reset_level(self.levels_list[0])
+        self._recover_autosave(previous_sessions)
+
+    def _recover_autosave(self, sessions):
+        # Відновлення незавершеної гри з найновішого журналу попередніх сесій
+        recovered = False
+        for path in sessions:
+            if not recovered and journal.restore(self.game_logic, path):
+                recovered = True
+                if self.game_logic.check_win():
+                    self.game_logic.reset_level(self.levels_list[0])
+                else:
+                    if self.game_logic.level_filename in self.levels_list:
+                        self.current_level_index = self.levels_list.index(self.game_logic.level_filename)
+                    self.state, self.preview_origin = "preview", "menu"
+                    # Повідомлення малює лише екран гри, тож його таймер
+                    # запускається при вході в гру, а не під час прев'ю і входу
+                    self.pending_message = "Гру відновлено з автозбереження"
+            os.remove(path)
 
     def run(self):
+        profiler = self.profiler
         while self.running:
+            profiler.begin(self.state)
             self._update_timers()
+            profiler.mark("timers")
             self._handle_events()
+            profiler.mark("events")
             self._update_logic()
-            self._draw()
+            profiler.mark("logic")
+            drawn = self.dirty
+            if drawn:
+                rects = self._draw_regions() if self.dirty_regions is not None else None
+                if rects is None:
+                    self._draw()
+                    if self.show_profiler:
+                        self.renderer.draw_profiler_overlay(profiler.recent_summary(), self.state)
+                profiler.mark("draw")
+                if rects is None:
+                    pygame.display.flip()
+                else:
+                    pygame.display.update(rects)
+                self.dirty = False
+                profiler.mark("flip")
+                if self.login_pending:
+                    self._after_first_frame()
             self.clock.tick(60)
+            profiler.mark("tick")
+            if self.running and not self.dirty:
+                self._wait_for_event()
+                profiler.mark("wait")
+            profiler.end(drawn)
         
+        self.score_writer.close()
+        self.game_logic.journal.close(remove=True)
+        if self.instrument_path:
+            instrumentation.export(self.instrument_path)
+        if self.stack_sampler is not None:
+            self._stop_stack_sampler()
+        close_connections()
         pygame.quit()
         sys.exit()
 
+    def _after_first_frame(self):
+        self.login_pending = False
+        self.profiler.first_frame_ms = (time.perf_counter() - STARTED) * 1000
+        if self.startup_check:
+            print(f"first_frame_ms {self.profiler.first_frame_ms:.1f}")
+            self.running = False
+            return
+        init_database()
+        from auth import LoginWindow
+        logged_in, user_id, username = LoginWindow().show_login()
+        if logged_in:
+            self.logged_in, self.user_id, self.username = logged_in, user_id, username
+        self.invalidate()
+
+    def invalidate(self, region=None):
+        # Позначає для перемальовування область region або (region=None) увесь екран
+        if region is None:
+            self.dirty, self.dirty_regions = True, None
+        elif not self.dirty:
+            self.dirty, self.dirty_regions = True, {region}
+        elif self.dirty_regions is not None:
+            self.dirty_regions.add(region)
+
+    def _idle_timeout(self):
+        # Скільки можна чекати на подію до найближчої запланованої зміни екрана, мс
+        now = pygame.time.get_ticks()
+        timeouts = [self.IDLE_TIMEOUT_MS]
+        if self.save_message:
+            timeouts.append(self.save_message_until - now)
+        if self.state == "game" and any(self.move_hold.values()):
+            timeouts.append(self.last_move_tick + self.MOVE_REPEAT_MS - now)
+        if self.state == "win" and self.drawn_save_status == PENDING:
+            timeouts.append(100)
+        if self.show_profiler:
+            timeouts.append(500)
+        return max(1, min(timeouts))
+
+    def _wait_for_event(self):
+        # Простій без перемальовування; отримана подія обробляється в наступному кадрі
+        event = pygame.event.wait(self._idle_timeout())
+        if event.type != pygame.NOEVENT:
+            self.waited_events.append(event)
+
+    def _stop_stack_sampler(self):
+        # Зупинка вибірки стеків і запис у файл; повертає шлях до файлу
+        self.stack_sampler.stop()
+        self.stack_sampler.export(self.stacks_path)
+        self.stack_sampler = None
+        return self.stacks_path
+
+    def _show_message(self, message):
+        self.save_message = message
+        self.save_message_until = pygame.time.get_ticks() + self.MESSAGE_MS
+        self.invalidate()
+
     def _handle_events(self):
-        for event in pygame.event.get():
+        events, self.waited_events = self.waited_events + pygame.event.get(), []
+        for event in events:
+            if event.type != pygame.MOUSEMOTION:
+                self.invalidate()
+
             if event.type == pygame.QUIT:
                 self.running = False
+
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F3:
+                self.show_profiler = not self.show_profiler
+
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F4:
+                path = self.profiler.dump(time.strftime("frame_profile_%Y%m%d-%H%M%S.json"))
+                self._show_message(f"Профіль кадрів: {path}")
+
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_F6:
+                if self.stack_sampler is None:
+                    self.stacks_path = time.strftime("stacks_%Y%m%d-%H%M%S.folded")
+                    self.stack_sampler = StackSampler().start()
+                    self._show_message("Вибірка стеків: F6 — зупинити")
+                else:
+                    self._show_message(f"Стеки: {self._stop_stack_sampler()}")
             
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 self._process_mouse_click(event.pos)
@@ -135,6 +301,9 @@ class SokobanApp:
     def _handle_preview_click(self, pos):
         if pygame.Rect(*UIConfig.PREVIEW_START).collidepoint(pos):
             self.state = "game"
+            if self.pending_message:
+                self._show_message(self.pending_message)
+                self.pending_message = ""
         elif pygame.Rect(*UIConfig.BACK_BTN).collidepoint(pos):
             self.state = self.preview_origin or "menu"
 
@@ -164,16 +333,22 @@ class SokobanApp:
 
     def _start_level(self, index, origin):
         self.current_level_index = index
+        self.pending_message = ""
         self.game_logic.reset_level(self.levels_list[index])
         self.state = "preview"
         self.preview_origin = origin
         self.move_hold = {k: False for k in self.move_hold}
 
     def _update_timers(self):
-        if self.save_message_timer > 0:
-            self.save_message_timer -= 1
-            if self.save_message_timer == 0:
-                self.save_message = ""
+        self.game_logic.journal.poll()
+        if self.save_message and pygame.time.get_ticks() >= self.save_message_until:
+            self.save_message = ""
+            self.invalidate("message")
+        if self.state == "win" and self.user_id and \
+                self.score_writer.status(self.score_ticket) != self.drawn_save_status:
+            self.invalidate("win_status")
+        if self.show_profiler and self.profiler.summary_due():
+            self.invalidate("profiler")
 
     def _update_logic(self):
         if self.state == "game" and not self.show_full_map:
@@ -183,12 +358,16 @@ class SokobanApp:
                     if is_held:
                         self._move_player_by_dir(direction)
                         self.last_move_tick = now
+                        self.invalidate()
                         break
             
             if self.game_logic.check_win():
                 if self.user_id:
-                    save_score(self.user_id, self.current_level_index + 1, self.game_logic.steps_count)
+                    self.score_ticket = self.score_writer.submit(
+                        self.user_id, self.current_level_index + 1, self.game_logic.steps_count
+                    )
                 self.state = "win"
+                self.invalidate()
 
     def _move_player_by_dir(self, direction):
         dirs = {"up": (0, -1), "down": (0, 1), "left": (-1, 0), "right": (1, 0)}
@@ -197,17 +376,39 @@ class SokobanApp:
 
     def _quick_save(self):
         self.game_logic.save_state_to_binary("quicksave.bin")
-        self.save_message, self.save_message_timer = "Гра збережена (F5)", 180
+        self._show_message("Гра збережена (F5)")
 
     def _quick_load(self):
         if self.game_logic.load_state_from_binary("quicksave.bin"):
-            self.save_message = "Гра загружена (F9)"
+            self._show_message("Гра загружена (F9)")
         else:
-            self.save_message = "Нема збереженої гри!"
-        self.save_message_timer = 180
+            self._show_message("Нема збереженої гри!")
 
 
+    def _draw_regions(self):
+        # Перемальовування лише областей dirty_regions поверх попереднього кадру;
+        # повертає змінені прямокутники або None, якщо потрібен повний кадр
+        rects = []
+        for region in self.dirty_regions:
+            if region == "message":
+                # Повідомлення зникло: повертається сцена під ним (якщо його малювали)
+                rect = self.renderer.clear_status_msg()
+                if rect is not None:
+                    rects.append(rect)
+                continue
+            if region == "win_status":
+                self.drawn_save_status = self.score_writer.status(self.score_ticket)
+                rect = self.renderer.draw_win_status(self.drawn_save_status, refresh=True)
+            else:
+                rect = self.renderer.draw_profiler_overlay(self.profiler.recent_summary(), self.state,
+                                                           refresh=True)
+            if rect is None:
+                return None
+            rects.append(rect)
+        return rects
+
     def _draw(self):
+        self.renderer.forget_overlays()
         if self.state == "menu":
             self.renderer.draw_menu(self.username)
         elif self.state == "levels":
@@ -219,13 +420,14 @@ class SokobanApp:
         elif self.state == "leaderboard":
             self.renderer.draw_leaderboard(len(self.levels_list))
         elif self.state == "win":
+            self.drawn_save_status = self.score_writer.status(self.score_ticket) if self.user_id else None
             self.renderer.draw_win_screen(
                 self.current_level_index, 
                 len(self.levels_list), 
                 self.game_logic.steps_count, 
-                self.user_id is not None
+                self.user_id is not None,
+                self.drawn_save_status
             )
-        pygame.display.flip()
 
     def _draw_game_screen(self):
         if self.show_full_map:
@@ -0,0 +1,239 @@
+import mmap
+import os
+import struct
+from board import Board
+from simulator import HeadlessEngine
+
+# Формат збереження гри:
+#   заголовок — сигнатура і версія,
+#   далі записи: тип (1 байт), довжина (4 байти), дані.
+# Записи лише дописуються в кінець файлу, тож повторне збереження
+# пише тільки те, що змінилося з попереднього:
+#   BOARD    — початковий стан історії (поле, позиція гравця, напрямок, кроки)
+#   MOVES    — ходи історії, 1 байт на хід: напрямок (2 біти) і біт поштовху
+#   TRUNCATE — скільки ходів історії лишається (після undo і нового ходу)
+#   STATE    — поточна позиція в історії, відвідані клітинки, дані гравця
+# Збереження вважається дійсним до останнього повного запису STATE.
+HEADER = struct.Struct("<4sB")
+RECORD = struct.Struct("<BI")
+BOARD = struct.Struct("<HHhhBI")
+TRUNCATE = struct.Struct("<I")
+STATE = struct.Struct("<IIBBhhBiiH")
+MAGIC = b"SKSV"
+VERSION = 1
+
+REC_BOARD, REC_MOVES, REC_TRUNCATE, REC_STATE = 1, 2, 3, 4
+
+# Напрямки ходу в порядку їх кодів
+DIRECTIONS = ("up", "down", "left", "right")
+VECTORS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+PUSH = 4
+# Літери LURD для кодів ходу (мала — крок, велика — поштовх)
+LURD = "udlrUDLR"
+
+# Скільки разів файл може перевищувати компактний розмір, перш ніж переписується заново
+COMPACT_RATIO = 2
+
+
+def is_savefile(filename):
+    # Чи файл у цьому форматі (а не старе збереження pickle)
+    try:
+        with open(filename, "rb") as f:
+            return f.read(len(MAGIC)) == MAGIC
+    except OSError:
+        return False
+
+
+def _direction_code(direction):
+    return DIRECTIONS.index(direction) if direction in DIRECTIONS else DIRECTIONS.index("down")
+
+
+def encode_moves(deltas):
+    # Дельти історії -> байти ходів
+    moves = bytearray()
+    for (px, py), (nx, ny), _, _, box_to in deltas:
+        code = VECTORS.index((nx - px, ny - py))
+        moves.append(code | PUSH if box_to is not None else code)
+    return moves
+
+
+def decode_moves(player, moves):
+    # Байти ходів -> дельти історії, починаючи з позиції гравця player
+    deltas = []
+    x, y = player
+    for code in moves:
+        dx, dy = VECTORS[code & 3]
+        nx, ny = x + dx, y + dy
+        if code & PUSH:
+            deltas.append(((x, y), (nx, ny), DIRECTIONS[code & 3], (nx, ny), (nx + dx, ny + dy)))
+        else:
+            deltas.append(((x, y), (nx, ny), DIRECTIONS[code & 3], None, None))
+        x, y = nx, ny
+    return deltas
+
+
+def to_lurd(moves):
+    # Байти ходів -> рядок LURD; IndexError для невідомого коду
+    return "".join(LURD[code] for code in moves)
+
+
+def check_moves(start, moves):
+    # Чи байти ходів можливі зі знімка start: гравець стоїть на полі, жоден хід
+    # не заблокований і кожен поштовх позначений у байті (і лише поштовх).
+    # Перевіряється безголовим рушієм до того, як ходи застосовуються до GameLogic
+    board, player = start["board"], start["player_pos"]
+    if not board.contains(*player) or any(code >= len(LURD) for code in moves):
+        return False
+    return HeadlessEngine(board, player).run(to_lurd(moves))["valid"]
+
+
+def _record(kind, payload):
+    return RECORD.pack(kind, len(payload)) + payload
+
+
+def pack_start(snapshot, goals):
+    # Знімок початку історії -> байти (поле, позиція гравця, напрямок, кроки)
+    board = snapshot["board"] if "board" in snapshot else Board.from_rows(snapshot["level"], goals)
+    (x, y), direction = snapshot["player_pos"], snapshot["direction"]
+    payload = BOARD.pack(board.width, board.height, x, y, _direction_code(direction), snapshot["steps"])
+    return payload + struct.pack(f"<{board.height}H", *board.row_lengths) + bytes(board.cells)
+
+
+def unpack_start(data, offset, end):
+    # Байти data[offset:end] -> знімок початку історії
+    width, height, x, y, direction, steps = BOARD.unpack_from(data, offset)
+    row_lengths = struct.unpack_from(f"<{height}H", data, offset + BOARD.size)
+    cells = bytearray(data[offset + BOARD.size + 2 * height:end])
+    if len(cells) != width * height:
+        raise ValueError("Пошкоджене поле у збереженні")
+    return {"board": Board(width, height, row_lengths, cells), "player_pos": (x, y),
+            "direction": DIRECTIONS[direction], "steps": steps}
+
+
+def _state_record(game_logic):
+    width, height = game_logic.board.width, game_logic.board.height
+    visited = bytearray((width * height + 7) // 8)
+    for x, y in game_logic.visited_positions:
+        if 0 <= x < width and 0 <= y < height:
+            i = y * width + x
+            visited[i >> 3] |= 1 << (i & 7)
+
+    player = game_logic.player_obj.to_dict() if game_logic.player_obj else None
+    name = (player.get("name") or "").encode("utf-8") if player else b""
+    payload = STATE.pack(
+        game_logic.history_index, game_logic.steps_count,
+        _direction_code(game_logic.current_direction),
+        player is not None,
+        player["x"] if player else 0, player["y"] if player else 0,
+        _direction_code(player.get("direction")) if player else 0,
+        player.get("score", 0) if player else 0, player.get("moves", 0) if player else 0,
+        len(name),
+    )
+    return _record(REC_STATE, payload + name + visited)
+
+
+def save(game_logic, filename):
+    # Збереження стану GameLogic. Якщо файл записаний цим же GameLogic і не
+    # змінювався, дописуються лише нові ходи та стан; інакше файл пишеться заново.
+    history = game_logic.history
+    state = _state_record(game_logic)
+    board = _record(REC_BOARD, pack_start(history[0], game_logic.goals))
+    compact_size = HEADER.size + len(board) + RECORD.size + len(history) - 1 + len(state)
+
+    saved, synced = game_logic.saved_file, game_logic.history_synced
+    try:
+        size = os.path.getsize(filename)
+    except OSError:
+        size = None
+    if saved and saved[0] == filename and saved[2] == size and synced >= 1 \
+            and size < compact_size * COMPACT_RATIO:
+        data = bytearray()
+        if synced < saved[1]:
+            data += _record(REC_TRUNCATE, TRUNCATE.pack(synced - 1))
+        if synced < len(history):
+            data += _record(REC_MOVES, bytes(encode_moves(history[synced:])))
+        data += state
+        with open(filename, "ab") as f:
+            f.write(data)
+        size += len(data)
+    else:
+        data = HEADER.pack(MAGIC, VERSION) + board
+        data += _record(REC_MOVES, bytes(encode_moves(history[1:]))) + state
+        # Запис через тимчасовий файл, щоб збій не зіпсував попереднє збереження
+        tmp = filename + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, filename)
+        size = len(data)
+
+    game_logic.saved_file = (filename, len(history), size)
+    game_logic.history_synced = len(history)
+
+
+def load(filename):
+    # Читання збереження через mmap; None, якщо файл пошкоджений
+    with open(filename, "rb") as f:
+        if os.fstat(f.fileno()).st_size < HEADER.size:
+            return None
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            return _parse(data)
+
+
+def _parse(data):
+    magic, version = HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        return None
+    offset, size = HEADER.size, len(data)
+    start = moves = committed = None
+    while offset + RECORD.size <= size:
+        kind, length = RECORD.unpack_from(data, offset)
+        offset += RECORD.size
+        if offset + length > size:
+            break  # обірваний останній запис
+        end = offset + length
+
+        if kind == REC_BOARD:
+            start = unpack_start(data, offset, end)
+            moves = bytearray()
+        elif start is None:
+            return None
+        elif kind == REC_MOVES:
+            moves += data[offset:end]
+        elif kind == REC_TRUNCATE:
+            del moves[TRUNCATE.unpack_from(data, offset)[0]:]
+        elif kind == REC_STATE:
+            fields = STATE.unpack_from(data, offset)
+            committed = (bytes(moves), fields, data[offset + STATE.size:end], end)
+        offset = end
+
+    if committed is None:
+        return None
+    moves, fields, tail, end = committed
+    (history_index, steps, direction, has_player, player_x, player_y,
+     player_direction, score, player_moves, name_length) = fields
+    if history_index > len(moves):
+        return None
+
+    width = start["board"].width
+    visited_bits = tail[name_length:]
+    visited = set()
+    for i in range(len(visited_bits) * 8):
+        if visited_bits[i >> 3] >> (i & 7) & 1:
+            visited.add((i % width, i // width))
+
+    player_data = None
+    if has_player:
+        player_data = {"x": player_x, "y": player_y, "name": bytes(tail[:name_length]).decode("utf-8"),
+                       "score": score, "moves": player_moves,
+                       "direction": DIRECTIONS[player_direction]}
+    return {
+        "start": start,
+        "moves": moves,
+        "history_index": history_index,
+        "steps_count": steps,
+        "current_direction": DIRECTIONS[direction],
+        "visited_positions": visited,
+        "player_data": player_data,
+        # розмір дійсної частини файлу: після нього можна дописувати
+        "size": end,
+    }
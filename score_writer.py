@@ -0,0 +1,91 @@
+import queue
+import threading
+from database import save_scores
+from db_utils import close_connections
+
+# Статуси запису результату
+PENDING, SAVED, FAILED = "pending", "saved", "failed"
+
+# Маркер завершення роботи потоку
+_STOP = object()
+
+
+class ScoreWriter:
+    # Відкладений запис результатів у фоновому потоці.
+    # Головний цикл лише ставить результат у чергу (без очікування на SQLite),
+    # потік забирає все накопичене і зберігає однією транзакцією.
+    # Кожен результат отримує номер; записи обробляються по черзі,
+    # тому всі номери, менші за _done, уже оброблені.
+
+    def __init__(self, max_pending=256, batch_size=64):
+        self.batch_size = batch_size
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._lock = threading.Lock()
+        self._next_ticket = 0
+        self._done = 0
+        self._failed = set()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="score-writer", daemon=True)
+            self._thread.start()
+        return self
+
+    def submit(self, user_id, level, steps):
+        # Номер запису або None, якщо черга переповнена
+        with self._lock:
+            ticket = self._next_ticket
+            try:
+                self._queue.put_nowait((ticket, (user_id, level, steps)))
+            except queue.Full:
+                return None
+            self._next_ticket += 1
+        return ticket
+
+    def status(self, ticket):
+        if ticket is None or ticket in self._failed:
+            return FAILED
+        return SAVED if ticket < self._done else PENDING
+
+    @property
+    def pending(self):
+        return self._next_ticket - self._done
+
+    def close(self, timeout=5.0):
+        # Дописує все, що залишилося в черзі, і зупиняє потік
+        if self._thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        try:
+            stopping = False
+            while not stopping:
+                batch = [self._queue.get()]
+                # забираємо все, що встигло накопичитися, без очікування
+                while len(batch) < self.batch_size:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                if _STOP in batch:
+                    stopping = True
+                    batch.remove(_STOP)
+                if batch:
+                    self._write(batch)
+        finally:
+            close_connections()
+
+    def _write(self, batch):
+        try:
+            save_scores([score for _, score in batch])
+        except Exception as e:
+            print(f"Помилка запису результатів: {e}")
+            self._failed.update(ticket for ticket, _ in batch)
+        self._done = batch[-1][0] + 1
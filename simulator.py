@@ -0,0 +1,196 @@
+import sys
+from board import WALL, GOAL, BOX, PLAYER, VOID
+from level_cache import level_cache
+
+# Клітинки, у які не можна ступити або заштовхнути ящик
+BLOCKED = WALL | VOID
+
+# Напрямки у нотації LURD (мала літера — крок, велика — поштовх)
+MOVE_DIRECTIONS = {
+    "l": "left", "u": "up", "r": "right", "d": "down",
+    "L": "left", "U": "up", "R": "right", "D": "down",
+}
+
+
+def load_level(filename):
+    # Поле рівня з папки levels/ і позиція гравця;
+    # ValueError, якщо файлу немає або на рівні немає гравця
+    board = level_cache.load(filename)
+    if board is None:
+        raise ValueError(f"Рівень не знайдено: {filename}")
+    for i, cell in enumerate(board.cells):
+        if cell & PLAYER:
+            return board, board.position(i)
+    raise ValueError(f"На рівні {filename} немає гравця (@)")
+
+
+class HeadlessEngine:
+    # Безголовий рушій для швидкого програвання ходів без pygame.
+    # Працює з власною копією поля з рамкою з VOID-клітинок, тому в гарячому
+    # циклі немає перевірок меж, історії, об'єктів і логування.
+
+    def __init__(self, board, player):
+        cells, width = board.padded()
+        for i, cell in enumerate(cells):
+            cells[i] = cell & ~PLAYER
+        self.width = width
+        self._source = board
+        self._initial_cells = bytes(cells)
+        self._initial_player = (player[1] + 1) * width + player[0] + 1
+
+        # Зміщення індексу для кожного байта рядка ходів і 1 для байтів-поштовхів
+        self._offsets = [None] * 256
+        self._push_codes = bytearray(256)
+        for ch, direction in MOVE_DIRECTIONS.items():
+            dx, dy = {"left": (-1, 0), "right": (1, 0), "up": (0, -1), "down": (0, 1)}[direction]
+            self._offsets[ord(ch)] = dy * width + dx
+            self._push_codes[ord(ch)] = ch.isupper()
+        self.reset()
+
+    # Створює рушій для файлу рівня з папки levels/.
+    @classmethod
+    def from_level(cls, filename):
+        return cls(*load_level(filename))
+
+    # Створює рушій з поточного стану GameLogic.
+    @classmethod
+    def from_game_logic(cls, game_logic):
+        return cls(game_logic.board, (game_logic.player_x, game_logic.player_y))
+
+    def reset(self):
+        # Повернення до початкового стану
+        self.cells = bytearray(self._initial_cells)
+        self.player = self._initial_player
+        self.steps = 0
+        self.pushes = 0
+        # Скільки ходів прочитано від початку і номер першого недопустимого
+        # (заблокованого або з літерою не того регістру) ходу
+        self.moves = 0
+        self.first_invalid = None
+        self.box_count = sum(1 for cell in self.cells if cell & BOX)
+        self.goal_count = sum(1 for cell in self.cells if cell & GOAL)
+        self.boxes_on_goals = sum(1 for cell in self.cells if cell & BOX and cell & GOAL)
+
+    def play(self, moves):
+        # Програвання рядка LURD від поточного стану. Заблоковані ходи
+        # пропускаються, а хід не того регістру (мала літера, що штовхає ящик,
+        # або велика без ящика) виконується як є; номер першого такого ходу
+        # від початку прогону зберігається у first_invalid
+        offsets, push_codes = self._offsets, self._push_codes
+        cells = self.cells
+        pos = self.player
+        steps = pushes = on_goals = 0
+        invalid = None
+        for i, code in enumerate(moves.encode("ascii")):
+            d = offsets[code]
+            if d is None:
+                raise ValueError(f"Невідомий хід: {chr(code)!r}")
+            target = pos + d
+            cell = cells[target]
+            if cell & BLOCKED:
+                if invalid is None:
+                    invalid = i
+                continue
+            if cell & BOX:
+                after = target + d
+                after_cell = cells[after]
+                if after_cell & (BLOCKED | BOX):
+                    if invalid is None:
+                        invalid = i
+                    continue
+                if not push_codes[code] and invalid is None:
+                    invalid = i
+                cells[target] = cell ^ BOX
+                cells[after] = after_cell | BOX
+                on_goals += (after_cell & GOAL) - (cell & GOAL)
+                pushes += 1
+            elif push_codes[code] and invalid is None:
+                invalid = i
+            pos = target
+            steps += 1
+        if invalid is not None and self.first_invalid is None:
+            self.first_invalid = self.moves + invalid
+        self.moves += len(moves)
+        self.player = pos
+        self.steps += steps
+        self.pushes += pushes
+        self.boxes_on_goals += on_goals // GOAL
+        return self
+
+    def is_won(self):
+        return self.boxes_on_goals == self.box_count == self.goal_count
+
+    def board(self):
+        # Поточне поле у форматі Board (без рамки, з гравцем)
+        source, width = self._source, self.width
+        board = source.copy()
+        for y in range(source.height):
+            start = (y + 1) * width + 1
+            board.cells[y * source.width:(y + 1) * source.width] = self.cells[start:start + source.width]
+        x, y = self.player % width - 1, self.player // width - 1
+        board.cells[board.index(x, y)] |= PLAYER
+        return board
+
+    def result(self):
+        # Підсумок прогону
+        return {
+            "steps": self.steps,
+            "pushes": self.pushes,
+            "won": self.is_won(),
+            "valid": self.first_invalid is None,
+            "first_invalid": self.first_invalid,
+            "boxes_on_goals": self.boxes_on_goals,
+            "player": (self.player % self.width - 1, self.player // self.width - 1),
+            "board": self.board(),
+        }
+
+    def run(self, moves):
+        # Прогін рядка ходів від початкового стану рівня
+        self.reset()
+        return self.play(moves).result()
+
+
+def simulate(level_filename, moves):
+    # Програвання одного рядка ходів на рівні
+    return HeadlessEngine.from_level(level_filename).run(moves)
+
+
+def simulate_file(level_filename, path):
+    # Програвання всіх рядків ходів з файлу (порожні рядки та коментарі # пропускаються)
+    engine = HeadlessEngine.from_level(level_filename)
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            moves = line.strip()
+            if moves and not moves.startswith("#"):
+                yield engine.run(moves)
+
+
+def main(argv=None):
+    # argparse і json потрібні лише командному рядку, не грі, що імпортує модуль
+    import argparse
+    import json
+    parser = argparse.ArgumentParser(description="Безголове програвання ходів Sokoban (LURD)")
+    parser.add_argument("level", help="файл рівня з папки levels/")
+    group = parser.add_mutually_exclusive_group(required=True)
+    group.add_argument("--moves", help="рядок ходів LURD")
+    group.add_argument("--file", help="файл з рядками ходів, по одному на рядок")
+    parser.add_argument("--show", action="store_true", help="вивести фінальну карту")
+    args = parser.parse_args(argv)
+
+    try:
+        results = simulate_file(args.level, args.file) if args.file else [simulate(args.level, args.moves)]
+        for result in results:
+            board = result.pop("board")
+            if args.show:
+                result["level"] = ["".join(row) for row in board.rows]
+            print(json.dumps(result, ensure_ascii=False))
+            if not result["valid"]:
+                print(f"Недопустимий хід №{result['first_invalid'] + 1}", file=sys.stderr)
+    except (ValueError, OSError) as e:
+        print(e, file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,850 @@
+import argparse
+import heapq
+import json
+import random
+import sys
+import time
+from collections import deque
+from operator import sub
+from board import BOX
+from level_tables import LevelTables, UNREACHABLE
+from simulator import load_level
+
+# Зміщення напрямків разом з літерами LURD (мала — крок, велика — поштовх)
+DIRECTION_LETTERS = ("l", "r", "u", "d")
+
+# "Нескінченність" для кроку угорського алгоритму
+INFINITY = float("inf")
+
+# Межа станів перевірки тупику коралю: довша перевірка вважається невдалою
+CORRAL_SEARCH_LIMIT = 200
+
+# Скільки результатів перевірки коралів тримати (далі кеш очищується)
+CORRAL_CACHE_SIZE = 100_000
+
+# Межа зворотних пошуків під час складання плану заповнення цілей
+PLAN_SEARCH_LIMIT = 5000
+
+
+def insert_row(costs, v, row_col, i):
+    # Один крок угорського алгоритму: рядок i додається до оптимального
+    # призначення за O(n^2). costs[r][j] — вартість рядка r для стовпця j,
+    # v — потенціали стовпців, row_col — стовпець кожного рядка (-1 — вільний).
+    # Потенціали рядків виводяться з рівності на призначених ребрах.
+    # v і row_col змінюються на місці
+    n = len(v)
+    u = [0] * len(costs)
+    col_row = [-1] * (n + 1)
+    for r, j in enumerate(row_col):
+        if j >= 0:
+            col_row[j] = r
+            u[r] = costs[r][j] - v[j]
+    pot = list(v) + [0]
+    col_row[n] = i
+    min_v, way, used = [INFINITY] * n, [n] * n, [False] * (n + 1)
+    j0 = n
+    while True:
+        used[j0] = True
+        r = col_row[j0]
+        row, ur = costs[r], u[r]
+        delta, j1 = INFINITY, -1
+        for j in range(n):
+            if not used[j]:
+                current = row[j] - ur - pot[j]
+                if current < min_v[j]:
+                    min_v[j], way[j] = current, j0
+                if min_v[j] < delta:
+                    delta, j1 = min_v[j], j
+        for j in range(n):
+            if used[j]:
+                u[col_row[j]] += delta
+                pot[j] -= delta
+            else:
+                min_v[j] -= delta
+        u[i] += delta
+        j0 = j1
+        if col_row[j0] < 0:
+            break
+    while j0 != n:
+        j1 = way[j0]
+        col_row[j0] = col_row[j1]
+        j0 = j1
+    v[:] = pot[:n]
+    for j in range(n):
+        if col_row[j] >= 0:
+            row_col[col_row[j]] = j
+
+
+def assignment_cost(cost):
+    # Мінімальна вартість призначення рядків стовпцям, рядків не більше, ніж стовпців
+    n, m = len(cost), len(cost[0]) if cost else 0
+    v, row_col = [0] * m, [-1] * n
+    for i in range(n):
+        insert_row(cost, v, row_col, i)
+    return sum(cost[i][j] for i, j in enumerate(row_col))
+
+
+class Solver:
+    # Пошук розв'язку за розташуванням ящиків. Стан — множина ящиків плюс
+    # нормалізована позиція гравця (найменший індекс досяжної області). Стани
+    # хешуються за Зобристом; таблиця відвіданих станів разом з чергою обмежена
+    # max_states, що і є обмеженням пам'яті пошуку. Ящики й область гравця
+    # зберігаються бітовими масками клітинок.
+    #
+    # Оцінка — мінімальне паросполучення ящиків з цілями — не перераховується
+    # з нуля: після поштовху одного ящика перевіряється лише його рядок (O(n)),
+    # і лише якщо призначення батька перестало бути оптимальним, рядок додається
+    # заново одним кроком угорського алгоритму (O(n^2)). Поштовх у коридор
+    # шириною 1 продовжується до виходу з нього одним макроходом. Відсікаються
+    # тупики заморожування і коралів; за PI-коралем розглядаються лише поштовхи
+    # в нього.
+    #
+    # goal_macros=False — A* з мінімумом поштовхів (weight > 1 — зважений A*).
+    # goal_macros=True — спершу пошук за планом заповнення цілей. План
+    # рахується наперед для кожної області суміжних цілей: порядок, за якого
+    # жодна заповнена клітинка не закриває шлях до наступних (за потреби ящик
+    # спершу відставляється на проміжну клітинку). Ящик ставиться на ціль лише
+    # доставкою — одним макроходом на наступну клітинку плану; решта поштовхів
+    # розчищає шлях. Стани групуються за ознаками (виконані кроки плану,
+    # кількість розділених ящиками областей), і групи розкриваються по колу,
+    # тож пошук не застрягає в одній гілці. Розв'язок уже не мінімальний за
+    # поштовхами; якщо за планом розв'язку немає, пошук повторюється A*.
+
+    def __init__(self, board, player, max_states=1_000_000, time_limit=None, weight=1,
+                 goal_macros=True, seed=2024):
+        cells, width = board.padded()
+        tables = LevelTables.for_board(board)
+        self.width = width
+        self.size = len(cells)
+        self.walls = tables.walls
+        self.goals = tables.goals
+        self.goal_set = frozenset(self.goals)
+        self.boxes = frozenset(i for i, cell in enumerate(cells) if cell & BOX)
+        self.player = (player[1] + 1) * width + player[0] + 1
+        self.directions = (-1, 1, -width, width)
+        self.max_states = max_states
+        self.time_limit = time_limit
+        # weight > 1 — зважений A*: швидше, але без гарантії мінімуму поштовхів
+        self.weight = weight
+
+        rng = random.Random(seed)
+        self.zobrist_box = [rng.getrandbits(64) for _ in range(self.size)]
+        self.zobrist_player = [rng.getrandbits(64) for _ in range(self.size)]
+
+        # Мертві клітинки і відстані у поштовхах рахуються один раз на планування рівня;
+        # costs[клітинка] — відстані від неї до кожної цілі (рядок для паросполучення)
+        self.dead = tables.dead
+        distances = list(tables.goal_distances)
+        self.costs = [None if self.walls[i] or self.dead[i] else tuple(dist[i] for dist in distances)
+                      for i in range(self.size)]
+        self.floor = sum(1 << i for i in range(self.size) if not self.walls[i])
+        self.goal_mask = sum(1 << goal for goal in self.goals)
+
+        # tunnels[k][клітинка] — поштовх у напрямку k на цю клітинку лишає ящик
+        # і гравця позаду нього в коридорі шириною 1 (не на цілі): ящик далі
+        # можна лише штовхати вздовж коридору, тож поштовх продовжується
+        walls = self.walls
+        self.tunnels = []
+        for d in self.directions:
+            side = width if d in (-1, 1) else 1
+            self.tunnels.append(bytes(
+                1 if width <= i < self.size - width and not walls[i] and i not in self.goal_set
+                and walls[i - side] and walls[i + side] and walls[i - d - side] and walls[i - d + side]
+                else 0
+                for i in range(self.size)))
+
+        # Результати перевірки тупиків коралів: (ящики, кораль, гравець) -> тупик
+        self.corral_deadlocks = {}
+
+        # plans[область] — кроки (клітинка, звідки), plan_masks[область][i] —
+        # клітинки, зайняті ящиками після перших i кроків
+        self.plans = self._plans(tables) if goal_macros else None
+        if self.plans is not None:
+            self.plan_masks = []
+            for plan in self.plans:
+                masks = [0]
+                for target, origin in plan:
+                    mask = masks[-1] | 1 << target
+                    masks.append(mask if origin is None else mask & ~(1 << origin))
+                self.plan_masks.append(masks)
+
+    # Створює розв'язувач для поточного стану GameLogic.
+    @classmethod
+    def for_game_logic(cls, game_logic, **options):
+        return cls(game_logic.board, (game_logic.player_x, game_logic.player_y), **options)
+
+    def _plans(self, tables):
+        # Плани заповнення областей суміжних цілей або None, якщо хоч для однієї
+        # області план не знайдено.
+        # Джерела — клітинки поза цілями, куди ящик можна дотягнути з початкових
+        # позицій без урахування інших ящиків: звідси ящики беруться для доставки
+        sources, stack = set(self.boxes), list(self.boxes)
+        while stack:
+            cell = stack.pop()
+            for d in self.directions:
+                target = cell + d
+                if not self.walls[target] and not self.walls[cell - d] \
+                        and target not in sources and target not in self.goal_set:
+                    sources.add(target)
+                    stack.append(target)
+        self.sources = sum(1 << cell for cell in sources if cell not in self.goal_set)
+
+        plans, seen = [], set()
+        for goal in self.goals:
+            if goal in seen:
+                continue
+            area, stack = {goal}, [goal]
+            while stack:
+                cell = stack.pop()
+                for d in self.directions:
+                    if cell + d in self.goal_set and cell + d not in area:
+                        area.add(cell + d)
+                        stack.append(cell + d)
+            seen |= area
+            self.plan_budget = PLAN_SEARCH_LIMIT
+            plan = self._plan(tables, sum(1 << cell for cell in area), set())
+            if plan is None:
+                return None
+            plans.append(plan)
+        return plans
+
+    def _plan(self, tables, occupied, failed):
+        # Кроки заповнення клітинок occupied у прямому порядку: (клітинка, звідки) —
+        # ящик з клітинки "звідки" (None — з джерела) доставляється на клітинку.
+        # Шукається з кінця: останньою заповнюється клітинка, з якої ящик можна
+        # витягти до джерела, коли решта зайняті; якщо такої немає, ящик
+        # відтягується на проміжну клітинку, яку теж доведеться звільнити.
+        # Першими пробуються клітинки, ближчі до джерел
+        if not occupied:
+            return []
+        if occupied in failed or self.plan_budget <= 0:
+            return None
+        walls = bytearray(self.walls)
+        cells = self._cells(occupied)
+        for cell in cells:
+            walls[cell] = 1
+        candidates = []
+        for cell in cells:
+            walls[cell] = 0
+            distances = tables.pull_distances((cell,), walls)
+            walls[cell] = 1
+            entry = min((distances[i] for i in self._cells(self.sources)), default=UNREACHABLE)
+            candidates.append((entry, cell))
+        parking = []
+        for _, cell in sorted(candidates):
+            self.plan_budget -= 1
+            spots = self._pull_out(occupied, cell)
+            if spots is None:
+                plan = self._plan(tables, occupied ^ (1 << cell), failed)
+                if plan is not None:
+                    return plan + [(cell, None)]
+            else:
+                parking.extend((cell, spot) for spot in spots)
+        for cell, spot in parking:
+            plan = self._plan(tables, occupied ^ (1 << cell) | (1 << spot), failed)
+            if plan is not None:
+                return plan + [(cell, spot)]
+        failed.add(occupied)
+        return None
+
+    def _pull_out(self, occupied, cell):
+        # Зворотний пошук: ящик тягнеться з клітинки cell, інші клітинки occupied
+        # зайняті. None, якщо його можна дотягти до джерела так, що гравець
+        # опиниться в області свого старту; інакше — список клітинок поза цілями,
+        # куди його можна відтягти за тієї ж умови
+        walls, dead, others = self.walls, self.dead, occupied & ~(1 << cell)
+        seen, queue = set(), []
+        for d in self.directions:
+            if not walls[cell + d] and not others >> (cell + d) & 1:
+                reach = self._reachable(others | 1 << cell, cell + d)
+                key = (cell, self._lowest(reach))
+                if key not in seen:
+                    seen.add(key)
+                    queue.append((cell, reach))
+        spots = []
+        for box, reach in queue:
+            if box != cell and reach >> self.player & 1:
+                if self.sources >> box & 1:
+                    return None
+                if box not in self.goal_set and box not in spots:
+                    spots.append(box)
+            for d in self.directions:
+                target, stand = box + d, box + 2 * d
+                if not reach >> target & 1 or walls[stand] or others >> stand & 1 or dead[target]:
+                    continue
+                new_reach = self._reachable(others | 1 << target, stand)
+                key = (target, self._lowest(new_reach))
+                if key not in seen:
+                    seen.add(key)
+                    queue.append((target, new_reach))
+        return spots
+
+    def _reachable(self, boxes, start):
+        # Бітова маска клітинок, досяжних гравцем без поштовхів.
+        # boxes — бітова маска клітинок з ящиками
+        free, width = self.floor & ~boxes, self.width
+        reach = 1 << start
+        while True:
+            grown = (reach | reach << 1 | reach >> 1 | reach << width | reach >> width) & free
+            if grown == reach:
+                return reach
+            reach = grown
+
+    @staticmethod
+    def _lowest(mask):
+        return (mask & -mask).bit_length() - 1
+
+    @staticmethod
+    def _cells(mask):
+        # Індекси встановлених бітів маски
+        cells = []
+        while mask:
+            low = mask & -mask
+            cells.append(low.bit_length() - 1)
+            mask ^= low
+        return cells
+
+    def _components(self, boxes):
+        # Кількість розділених ящиками областей вільних клітинок
+        free, count = self.floor & ~boxes, 0
+        while free:
+            free &= ~self._reachable(boxes, self._lowest(free))
+            count += 1
+        return count
+
+    def _regions(self, boxes):
+        # Функція (p, q) -> область гравця в клітинці q, коли до boxes додано ящик
+        # на вільній клітинці p. Якщо p не розрізає свого околу (вільні сусіди
+        # з'єднані в обхід неї), досить вилучити p з області без нього
+        free, width = self.floor & ~boxes, self.width
+        areas, cache = [], {}
+
+        def region(p, q):
+            for area in areas:
+                if area >> q & 1:
+                    break
+            else:
+                area = self._reachable(boxes, q)
+                areas.append(area)
+            if not area >> p & 1:
+                return area
+            n, e = free >> (p - width) & 1, free >> (p + 1) & 1
+            s, w = free >> (p + width) & 1, free >> (p - 1) & 1
+            links = (n & e & free >> (p - width + 1)) + (e & s & free >> (p + width + 1)) \
+                + (s & w & free >> (p + width - 1)) + (w & n & free >> (p - width - 1))
+            if n + e + s + w - links <= 1:
+                return area & ~(1 << p)
+            reach = cache.get((p, q))
+            if reach is None:
+                reach = self._reachable(boxes | 1 << p, q)
+                for cell in (p - 1, p + 1, p - width, p + width):
+                    if reach >> cell & 1:
+                        cache[p, cell] = reach
+            return reach
+        return region
+
+    def _deliveries(self, boxes, reach, target, candidates):
+        # Ящики з маски candidates, які можна доставити на клітинку target, не
+        # рушачи інших: {ящик: напрямки поштовхів}. Зворотний пошук тягне уявний
+        # ящик від target (стан — його клітинка й область гравця); справжній
+        # ящик знайдено, коли він стоїть на прямій лінії тяги, гравець може
+        # стати за ним, а після поштовхів — дійти до області стану
+        walls, dead = self.walls, self.dead
+        region = self._regions(boxes)
+        found, parents, queue = {}, {}, []
+        for d in self.directions:
+            box, pushes = target + d, 1
+            while not walls[box] and not boxes >> box & 1:
+                box += d
+                pushes += 1
+            if candidates >> box & 1 and box not in found and reach >> (box + d) & 1:
+                found[box] = (-d,) * pushes
+            if not walls[target + d] and not boxes >> (target + d) & 1:
+                area = region(target, target + d)
+                key = (target, self._lowest(area))
+                if key not in parents:
+                    parents[key] = None
+                    queue.append((target, area, key))
+        for cell, area, key in queue:
+            for d in self.directions:
+                p = cell + d
+                if walls[p]:
+                    continue
+                if area >> p & 1 and not dead[p] and not walls[p + d] and not boxes >> (p + d) & 1:
+                    new_area = region(p, p + d)
+                    new_key = (p, self._lowest(new_area))
+                    if new_key not in parents:
+                        parents[new_key] = (key, -d)
+                        queue.append((p, new_area, new_key))
+                # Ящик на лінії тяги: гравець штовхає його до cell і опиняється на p
+                box, pushes = p, 1
+                while not walls[box] and not boxes >> box & 1:
+                    box += d
+                    pushes += 1
+                if not candidates >> box & 1 or box in found or not reach >> (box + d) & 1:
+                    continue
+                if not area >> p & 1 and not self._reachable(boxes ^ (1 << box) | 1 << cell, p) & area:
+                    continue
+                path, step = [-d] * pushes, key
+                while parents[step] is not None:
+                    step, direction = parents[step]
+                    path.append(direction)
+                found[box] = tuple(path)
+        return found
+
+    def _progress(self, boxes):
+        # Виконання планів: (кількість виконаних кроків, маска ящиків, що стоять
+        # за планом і не рухаються, наступні кроки областей). Виконаним
+        # вважається найдовший початок плану, після якого зайняті клітинки
+        # стоять на місцях (з відставленими ящиками клітинки й звільняються)
+        done, locked, steps = 0, 0, []
+        for plan, masks in zip(self.plans, self.plan_masks):
+            i = max(i for i, mask in enumerate(masks) if not mask & ~boxes)
+            done += i
+            locked |= masks[i]
+            if i < len(plan):
+                steps.append(plan[i])
+        return done, locked, steps
+
+    def _corral(self, boxes, reach):
+        # Обрізання за коралями. Кораль — область вільних клітинок, недосяжних
+        # гравцем; її оточують ящики. Якщо в коралі ще є робота (ящик не на цілі
+        # або порожня ціль), а ящики навколо нього не можуть ні стати на цілі,
+        # ні відкрити кораль гравцеві, стан тупиковий — повертається 0.
+        # PI-кораль: кожен можливий поштовх ящиків на його межі веде всередину
+        # коралю (I), і гравець може виконати кожен такий поштовх (P); будь-який
+        # розв'язок колись штовхне ящик межі всередину, тож досить розглядати
+        # лише ці поштовхи. Повертає бітову маску клітинок PI-коралю з
+        # найменшою кількістю таких поштовхів або None
+        walls, dead, width = self.walls, self.dead, self.width
+        rest = self.floor & ~boxes & ~reach
+        best = None
+        while rest:
+            area = rest & -rest
+            while True:
+                grown = (area | area << 1 | area >> 1 | area << width | area >> width) & rest
+                if grown == area:
+                    break
+                area = grown
+            rest &= ~area
+            around = (area << 1 | area >> 1 | area << width | area >> width) & boxes
+            needed = bool(area & self.goal_mask) or bool(around & ~self.goal_mask)
+            if not needed:
+                continue
+            if self._corral_deadlock(boxes, area, around, reach):
+                return 0
+            pushes = 0
+            for box in self._cells(around):
+                near = 1 << box - 1 | 1 << box + 1 | 1 << box - width | 1 << box + width
+                if not near & reach:
+                    # Ящик усередині коралю: до нього можна дістатися лише через
+                    # кораль, якщо поруч немає інших областей і чужих ящиків
+                    if near & self.floor & ~area & ~around:
+                        break
+                    continue
+                for d in self.directions:
+                    target, stand = box + d, box - d
+                    if walls[target] or walls[stand] or dead[target]:
+                        continue
+                    if around >> target & 1 or around >> stand & 1 or area >> stand & 1:
+                        continue  # спершу має зрушити інший ящик коралю або гравець має увійти в кораль
+                    if boxes >> target & 1 or boxes >> stand & 1 \
+                            or not area >> target & 1 or not reach >> stand & 1:
+                        break
+                    pushes += 1
+                else:
+                    continue
+                break
+            else:
+                if best is None or pushes < best[0]:
+                    best = (pushes, area)
+        return best and best[1]
+
+    def _corral_deadlock(self, boxes, area, around, reach):
+        # Перевірка тупику на спрощеній задачі: лишаються тільки ящики навколо
+        # коралю та їхні сусіди (без решти ящиків розв'язати лише легше).
+        # Результати кешуються, кеш очищується після CORRAL_CACHE_SIZE записів
+        width = self.width
+        subset = around | (around << 1 | around >> 1 | around << width | around >> width) & boxes
+        key = (subset, area, self._lowest(reach))
+        deadlock = self.corral_deadlocks.get(key)
+        if deadlock is None:
+            if len(self.corral_deadlocks) >= CORRAL_CACHE_SIZE:
+                self.corral_deadlocks.clear()
+            deadlock = self.corral_deadlocks[key] = self._closed_corral(subset, area, key[2])
+        return deadlock
+
+    def _closed_corral(self, boxes, area, player):
+        # True, якщо жодна послідовність поштовхів ящиків boxes не ставить їх усіх
+        # на цілі і не відкриває гравцеві кораль area. Пошук у глибину обмежений
+        # CORRAL_SEARCH_LIMIT станами; не закінчений пошук — не тупик
+        walls, dead = self.walls, self.dead
+        reach = self._reachable(boxes, player)
+        if reach & area:
+            return False
+        seen, stack = {(boxes, self._lowest(reach))}, [(boxes, reach)]
+        while stack:
+            boxes, reach = stack.pop()
+            if not boxes & ~self.goal_mask:
+                return False
+            for box in self._cells(boxes):
+                for d in self.directions:
+                    target = box + d
+                    if walls[target] or dead[target] or boxes >> target & 1 or not reach >> (box - d) & 1:
+                        continue
+                    new_boxes = boxes ^ (1 << box) ^ (1 << target)
+                    if self._frozen(target, new_boxes):
+                        continue
+                    new_reach = self._reachable(new_boxes, box)
+                    if new_reach & area:
+                        return False
+                    key = (new_boxes, self._lowest(new_reach))
+                    if key not in seen:
+                        if len(seen) >= CORRAL_SEARCH_LIMIT:
+                            return False
+                        seen.add(key)
+                        stack.append((new_boxes, new_reach))
+        return True
+
+    def _pushes(self, boxes, reach, corral, locked=0, goals=0):
+        # Поштовхи (ящик, куди він став, напрямки макроходу) ящиків поза маскою
+        # locked; поштовхи на клітинки маски goals пропускаються.
+        # Якщо є PI-кораль, лише поштовхи в нього
+        walls, dead, tunnels = self.walls, self.dead, self.tunnels
+        moves = []
+        for box in self._cells(boxes & ~locked):
+            for k, d in enumerate(self.directions):
+                target = box + d
+                if walls[target] or dead[target] or boxes >> target & 1 or not reach >> (box - d) & 1:
+                    continue
+                if corral is not None and not corral >> target & 1:
+                    continue
+                # Макрохід через коридор
+                dirs, tunnel = (d,), tunnels[k]
+                while tunnel[target] and not (walls[target + d] or dead[target + d]
+                                              or boxes >> (target + d) & 1):
+                    target += d
+                    dirs += (d,)
+                if not goals >> target & 1:
+                    moves.append((box, target, dirs))
+        return moves
+
+    def _matching(self, rows):
+        # Оптимальне призначення ящиків rows цілям з нуля:
+        # (ящики, потенціали цілей, ціль кожного ящика)
+        costs = [self.costs[box] for box in rows]
+        v, row_col = [0] * len(rows), [-1] * len(rows)
+        for i in range(len(rows)):
+            insert_row(costs, v, row_col, i)
+        return rows, tuple(v), tuple(row_col)
+
+    def _cost(self, matching):
+        rows, _, row_col = matching
+        return sum(self.costs[box][j] for box, j in zip(rows, row_col))
+
+    def _moved(self, matching, h, box, target):
+        # Оцінка після переміщення ящика з box на target і нове призначення;
+        # None замість призначення, якщо призначення батька лишається
+        # оптимальним (змінюється лише клітинка ящика)
+        rows, v, row_col = matching
+        i = rows.index(box)
+        j = row_col[i]
+        cost = self.costs[target]
+        if min(map(sub, cost, v)) >= cost[j] - v[j]:
+            return h - self.costs[box][j] + cost[j], None
+        rows = rows[:i] + (target,) + rows[i + 1:]
+        v, row_col = list(v), list(row_col)
+        row_col[i] = -1
+        insert_row([self.costs[cell] for cell in rows], v, row_col, i)
+        moved = rows, tuple(v), tuple(row_col)
+        return self._cost(moved), moved
+
+    @staticmethod
+    def _pushed(matching, push):
+        # Призначення батька з ящиком, переставленим поштовхом push
+        rows, v, row_col = matching
+        box, dirs = push
+        i = rows.index(box)
+        return rows[:i] + (box + sum(dirs),) + rows[i + 1:], v, row_col
+
+    def _frozen(self, box, boxes):
+        # Тупик заморожування: ящик box не може зрушити ні по горизонталі, ні по
+        # вертикалі (стіни, пари мертвих клітинок або інші заморожені ящики),
+        # і серед заморожених ним ящиків є хоч один не на цілі
+        frozen = []
+        if not self._is_frozen(box, boxes, set(), frozen):
+            return False
+        return any(cell not in self.goal_set for cell in frozen)
+
+    def _is_frozen(self, box, boxes, checked, frozen):
+        # Ящики, що перевіряються, на час перевірки вважаються стінами (без зациклення)
+        walls, dead = self.walls, self.dead
+        checked.add(box)
+        for axis in (1, self.width):
+            a, b = box - axis, box + axis
+            if walls[a] or walls[b] or (dead[a] and dead[b]) or a in checked or b in checked:
+                continue
+            if boxes >> a & 1 and self._is_frozen(a, boxes, checked, frozen):
+                continue
+            if boxes >> b & 1 and self._is_frozen(b, boxes, checked, frozen):
+                continue
+            checked.discard(box)
+            return False
+        frozen.append(box)
+        return True
+
+    def _hash(self, boxes):
+        value = 0
+        for box in boxes:
+            value ^= self.zobrist_box[box]
+        return value
+
+    def solve(self):
+        # Пошук розв'язку; повертає словник з результатом та статистикою
+        started = time.perf_counter()
+        deadline = started + self.time_limit if self.time_limit is not None else None
+        result = {"solved": False, "status": "unsolvable", "moves": None,
+                  "pushes": 0, "steps": 0, "explored": 0, "time": 0.0}
+        if len(self.boxes) == len(self.goals) and not any(self.dead[box] for box in self.boxes):
+            if self.plans is not None:
+                self._pack(result, deadline)
+            if result["status"] == "unsolvable":
+                # План міг відсікти єдині розв'язки
+                self._search(result, deadline)
+        result["time"] = time.perf_counter() - started
+        return result
+
+    def _start(self):
+        # Початок пошуку: (оцінка, ящики, хеш ящиків, призначення)
+        matching = self._matching(tuple(sorted(self.boxes)))
+        return self._cost(matching), sum(1 << box for box in self.boxes), self._hash(self.boxes), matching
+
+    def _search(self, result, deadline):
+        # A*. Таблиця транспозицій: ключ стану -> (ключ батька, поштовх, що привів
+        # у стан), поштовх — (клітинка ящика, напрямки поштовхів макроходу).
+        # best: "сирий" ключ (ящики + клітинка гравця) -> найменше g серед станів
+        # у черзі; гірші дублікати не додаються, а застарілі записи черги
+        # відкидаються до будь-якої роботи з ними. Запис черги несе призначення
+        # батька, якщо воно лишилось оптимальним, або власне. При рівних f
+        # першими розкриваються глибші стани.
+        start_h, start_boxes, start_hash, start_matching = self._start()
+        if start_h >= UNREACHABLE:
+            return
+
+        zobrist_box, zobrist_player, weight = self.zobrist_box, self.zobrist_player, self.weight
+        closed, best = {}, {}
+        counter = 0
+        best[start_hash ^ zobrist_player[self.player]] = 0
+        heap = [(start_h * weight, 0, counter, start_h, start_hash, start_boxes,
+                 self.player, None, None, start_matching, True)]
+        while heap:
+            if deadline is not None and time.perf_counter() > deadline:
+                result["status"] = "timeout"
+                return
+            _, g, _, h, box_hash, boxes, player, parent, push, matching, own = heapq.heappop(heap)
+            g = -g
+            if best[box_hash ^ zobrist_player[player]] < g:
+                continue
+            reach = self._reachable(boxes, player)
+            key = box_hash ^ zobrist_player[self._lowest(reach)]
+            if key in closed:
+                continue
+            closed[key] = (parent, push)
+            result["explored"] += 1
+
+            if h == 0:
+                # Оцінка 0 означає, що всі ящики на цілях
+                self._solved(result, closed, key)
+                return
+
+            if len(closed) + len(heap) >= self.max_states:
+                result["status"] = "memory"
+                return
+
+            if not own:
+                matching = self._pushed(matching, push)
+            for box, target, dirs in self._pushes(boxes, reach, self._corral(boxes, reach)):
+                new_boxes = boxes ^ (1 << box) ^ (1 << target)
+                if self._frozen(target, new_boxes):
+                    continue
+                new_g = g + len(dirs)
+                new_hash = box_hash ^ zobrist_box[box] ^ zobrist_box[target]
+                raw = new_hash ^ zobrist_player[target - dirs[-1]]
+                if best.get(raw, new_g + 1) <= new_g:
+                    continue
+                new_h, moved = self._moved(matching, h, box, target)
+                if new_h >= UNREACHABLE:
+                    continue
+                best[raw] = new_g
+                counter += 1
+                heapq.heappush(heap, (new_g + new_h * weight, -new_g, counter, new_h, new_hash, new_boxes,
+                                      target - dirs[-1], key, (box, dirs),
+                                      matching if moved is None else moved, moved is not None))
+        result["status"] = "unsolvable"
+
+    def _pack(self, result, deadline):
+        # Пошук за планом заповнення цілей. Черги станів згруповано за ознаками
+        # (-виконані кроки плану, кількість областей вільних клітинок); групи
+        # розкриваються по колу, у групі — стан з найменшою оцінкою.
+        # Записи черги й таблиця транспозицій — як у _search
+        start_h, start_boxes, start_hash, start_matching = self._start()
+        if start_h >= UNREACHABLE:
+            return
+
+        zobrist_box, zobrist_player = self.zobrist_box, self.zobrist_player
+        closed, best, groups = {}, {}, {}
+        counter, queued, turn = 0, 1, []
+        best[start_hash ^ zobrist_player[self.player]] = 0
+        features = (-self._progress(start_boxes)[0], self._components(start_boxes))
+        groups[features] = [(start_h, 0, counter, start_h, start_hash, start_boxes,
+                             self.player, None, None, start_matching, True)]
+        while groups:
+            if deadline is not None and time.perf_counter() > deadline:
+                result["status"] = "timeout"
+                return
+            if not turn:
+                turn = sorted(groups, reverse=True)
+            features = turn.pop()
+            heap = groups.get(features)
+            if heap is None:
+                continue
+            _, g, _, h, box_hash, boxes, player, parent, push, matching, own = heapq.heappop(heap)
+            if not heap:
+                del groups[features]
+            queued -= 1
+            g = -g
+            if best[box_hash ^ zobrist_player[player]] < g:
+                continue
+            reach = self._reachable(boxes, player)
+            key = box_hash ^ zobrist_player[self._lowest(reach)]
+            if key in closed:
+                continue
+            closed[key] = (parent, push)
+            result["explored"] += 1
+
+            if h == 0:
+                self._solved(result, closed, key)
+                return
+
+            if len(closed) + queued >= self.max_states:
+                result["status"] = "memory"
+                return
+
+            if not own:
+                matching = self._pushed(matching, push)
+            _, locked, steps = self._progress(boxes)
+            corral = self._corral(boxes, reach)
+            moves = []
+            for target, origin in steps:
+                candidates = boxes & ~locked if origin is None else 1 << origin
+                for box, dirs in self._deliveries(boxes, reach, target, candidates).items():
+                    if corral is None or corral >> (box + dirs[0]) & 1:
+                        moves.append((box, target, dirs))
+            # На цілі ящики ставляться лише доставками за планом
+            moves += self._pushes(boxes, reach, corral, locked, self.goal_mask)
+
+            for box, target, dirs in moves:
+                new_boxes = boxes ^ (1 << box) ^ (1 << target)
+                if self._frozen(target, new_boxes):
+                    continue
+                new_g = g + len(dirs)
+                new_hash = box_hash ^ zobrist_box[box] ^ zobrist_box[target]
+                raw = new_hash ^ zobrist_player[target - dirs[-1]]
+                if best.get(raw, new_g + 1) <= new_g:
+                    continue
+                new_h, moved = self._moved(matching, h, box, target)
+                if new_h >= UNREACHABLE:
+                    continue
+                best[raw] = new_g
+                counter += 1
+                queued += 1
+                features = (-self._progress(new_boxes)[0], self._components(new_boxes))
+                heapq.heappush(groups.setdefault(features, []),
+                               (new_h, -new_g, counter, new_h, new_hash, new_boxes,
+                                target - dirs[-1], key, (box, dirs),
+                                matching if moved is None else moved, moved is not None))
+        result["status"] = "unsolvable"
+
+    def _solved(self, result, closed, key):
+        pushes = self._unwind(closed, key)
+        result.update(solved=True, status="solved", pushes=sum(len(dirs) for _, dirs in pushes),
+                      moves=self._to_lurd(pushes))
+        result["steps"] = len(result["moves"])
+
+    def _unwind(self, closed, key):
+        # Відновлення послідовності поштовхів від кінцевого стану
+        pushes = []
+        while True:
+            parent, push = closed[key]
+            if push is None:
+                break
+            pushes.append(push)
+            key = parent
+        pushes.reverse()
+        return pushes
+
+    def _walk(self, boxes, start, goal):
+        # Найкоротший шлях гравця між клітинками без поштовхів (BFS)
+        came_from = {start: None}
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            if cell == goal:
+                break
+            for d, letter in zip(self.directions, DIRECTION_LETTERS):
+                nxt = cell + d
+                if nxt not in came_from and not self.walls[nxt] and nxt not in boxes:
+                    came_from[nxt] = (cell, letter)
+                    queue.append(nxt)
+        path = []
+        while came_from[goal] is not None:
+            goal, letter = came_from[goal]
+            path.append(letter)
+        return "".join(reversed(path))
+
+    def _to_lurd(self, pushes):
+        # Перетворення послідовності поштовхів у повний рядок ходів LURD
+        boxes, player, moves = set(self.boxes), self.player, []
+        for box, dirs in pushes:
+            boxes.remove(box)
+            for d in dirs:
+                moves.append(self._walk(boxes | {box}, player, box - d))
+                moves.append(DIRECTION_LETTERS[self.directions.index(d)].upper())
+                player, box = box, box + d
+            boxes.add(box)
+        return "".join(moves)
+
+
+def solve_level(game_logic, **options):
+    # Розв'язання поточного стану гри
+    return Solver.for_game_logic(game_logic, **options).solve()
+
+
+def solve_file(level_filename, **options):
+    # Розв'язання рівня з папки levels/
+    # ValueError, якщо файлу немає або на рівні немає гравця
+    board, player = load_level(level_filename)
+    return Solver(board, player, **options).solve()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Розв'язувач рівнів Sokoban")
+    parser.add_argument("level", help="файл рівня з папки levels/")
+    parser.add_argument("--max-states", type=int, default=1_000_000, help="ліміт станів у пам'яті")
+    parser.add_argument("--time-limit", type=float, default=None, help="ліміт часу, секунд")
+    parser.add_argument("--optimal", action="store_true",
+                        help="лише A* з мінімумом поштовхів (великі рівні можуть не розв'язатися)")
+    parser.add_argument("--weight", type=float, default=1, help="вага оцінки A* (>1 — швидше, не оптимально)")
+    args = parser.parse_args(argv)
+    try:
+        result = solve_file(args.level, max_states=args.max_states, time_limit=args.time_limit,
+                            weight=args.weight, goal_macros=not args.optimal)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    print(json.dumps(result, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
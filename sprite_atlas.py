@@ -0,0 +1,116 @@
+import json
+import math
+import os
+import sys
+import pygame
+
+# Атлас спрайтів: усі спрайти гри в одному PNG і індекс у JSON.
+# Замість окремого завантаження й декодування кожного файлу рендерер читає
+# одне зображення та бере спрайти як його підповерхні.
+# Індекс: прямокутник кожного спрайта в атласі та mtime_ns і розмір файлу,
+# з якого він узятий; атлас вважається актуальним, поки вони збігаються.
+ATLAS_IMAGE = "images/atlas.png"
+ATLAS_INDEX = "images/atlas.json"
+VERSION = 1
+
+# Спрайти, що використовує гра
+SPRITES = {
+    "player_down": "images/down/player_down_1.png",
+    "player_up": "images/up/player_up_1.png",
+    "player_left": "images/left/player_left_1.png",
+    "player_right": "images/right/player_right_1.png",
+    "wall": "images/walls/block_01.png",
+    "floor": "images/ground/ground_06.png",
+    "box": "images/boxes/crate_02.png",
+    "goal": "images/enviroment/environment_02.png",
+}
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return [stat.st_mtime_ns, stat.st_size]
+
+
+def pack(sizes):
+    # Розкладка прямокутників по рядках (від найвищого) у смугу шириною ~ sqrt(площі).
+    # sizes: {назва: (ширина, висота)} -> ({назва: (x, y, ширина, висота)}, (ширина, висота))
+    area = sum(w * h for w, h in sizes.values())
+    limit = max([int(math.ceil(math.sqrt(area)))] + [w for w, _ in sizes.values()])
+    rects, x, y, row_height, width = {}, 0, 0, 0, 0
+    for name, (w, h) in sorted(sizes.items(), key=lambda item: (-item[1][1], item[0])):
+        if x + w > limit:
+            x, y, row_height = 0, y + row_height, 0
+        rects[name] = (x, y, w, h)
+        x += w
+        row_height = max(row_height, h)
+        width = max(width, x)
+    return rects, (width, y + row_height)
+
+
+def build(sprites=SPRITES, image_path=ATLAS_IMAGE, index_path=ATLAS_INDEX):
+    # Побудова атласу з наявних файлів sprites; повертає індекс
+    images, sources = {}, {}
+    for name, path in sprites.items():
+        try:
+            images[name] = pygame.image.load(path)
+            sources[name] = [path] + _source_stamp(path)
+        except (OSError, pygame.error):
+            continue  # відсутній спрайт рендерер завантажить (або замінить) окремо
+    rects, size = pack({name: surf.get_size() for name, surf in images.items()})
+
+    atlas = pygame.Surface(size, pygame.SRCALPHA)
+    atlas.fill((0, 0, 0, 0))
+    for name, surf in images.items():
+        # BLEND_RGBA_MAX на прозорий фон копіює пікселі без змішування за альфою
+        atlas.blit(surf, rects[name][:2], special_flags=pygame.BLEND_RGBA_MAX)
+
+    index = {"version": VERSION, "sprites": {name: list(rects[name]) for name in images}, "sources": sources}
+    # Спочатку зображення, потім індекс: індекс без зображення не з'явиться
+    pygame.image.save(atlas, image_path)
+    tmp = index_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, index_path)
+    return index
+
+
+def load(sprites=SPRITES, image_path=ATLAS_IMAGE, index_path=ATLAS_INDEX):
+    # Спрайти з атласу як підповерхні {назва: Surface}; None, якщо атласу немає,
+    # він застарів або не містить когось зі спрайтів (тоді їх читають окремо).
+    # Потребує встановленого режиму дисплея (convert_alpha)
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("version") != VERSION:
+            return None
+        for name, path in sprites.items():
+            source = index["sources"].get(name)
+            if source is None or source[0] != path or source[1:] != _source_stamp(path):
+                return None
+        atlas = pygame.image.load(image_path).convert_alpha()
+        return {name: atlas.subsurface(index["sprites"][name]) for name in sprites}
+    except (OSError, ValueError, KeyError, TypeError, pygame.error):
+        return None
+
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description="Побудова атласу спрайтів Sokoban")
+    parser.add_argument("-o", "--output", default=ATLAS_IMAGE, help="файл атласу (PNG)")
+    parser.add_argument("--index", default=ATLAS_INDEX, help="файл індексу (JSON)")
+    args = parser.parse_args(argv)
+
+    # Шляхи спрайтів задані відносно папки гри
+    output, index_path = os.path.abspath(args.output), os.path.abspath(args.index)
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    index = build(image_path=output, index_path=index_path)
+    missing = sorted(set(SPRITES) - set(index["sprites"]))
+    print(f"{output}: {len(index['sprites'])} спрайтів")
+    if missing:
+        print("Не знайдено: " + ", ".join(missing), file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())